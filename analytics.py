@@ -0,0 +1,255 @@
+import threading
+import time
+
+from database import STATUS_IDS, data_version
+
+try:
+    import numpy as np
+except ImportError:  # optional; the app falls back to SQL without it
+    np = None
+
+# --- Columnar Attendance Analytics ---
+# Attendance is held in memory as parallel NumPy columns (int64 attendance
+# id, int32 student id, int16 subject id, int16 day number, uint8 status
+# with 0 = Present, 1 = Absent, 2 = Leave) together with a (status, student,
+# subject) count matrix for the report aggregates. A sync compares the
+# attendance data version with the one the columns were built from, appends
+# the rows past the attendance.id high-water mark and re-reads the rows
+# named in attendance_changes (re-marks and deletes). If those do not account
+# for every write since, the columns are reloaded.
+
+DAY_ZERO = 10957  # attendance.day of 2000-01-01; day numbers fit in int16
+NO_DAY = -32768   # rows whose date SQLite cannot read (day IS NULL): counted, never in a date range
+ORDINAL_ZERO = 730120  # date(2000, 1, 1).toordinal()
+LOAD_CHUNK = 100000
+
+def available():
+    return np is not None
+
+class ColumnarAnalytics:
+    def __init__(self):
+        if np is None:
+            raise RuntimeError('ColumnarAnalytics needs NumPy')
+        self._lock = threading.Lock()
+        self.subjects = []
+        self._codes = {}
+        self.version = None
+        self.high_water = 0
+        self.change_seq = 0
+        self.ids = np.zeros(0, np.int64)
+        self.students = np.zeros(0, np.int32)
+        self.subject_codes = np.zeros(0, np.int16)
+        self.days = np.zeros(0, np.int16)
+        self.statuses = np.zeros(0, np.uint8)
+        self.counts = np.zeros((3, 1, 1), np.uint32)
+        self.full_loads = 0
+        self.appends = 0
+        self.patches = 0
+        self.last_sync_ms = 0.0
+
+    # --- Loading ---
+
+    def _sync_subjects(self, conn):
+        # self.subjects is indexed by subjects.id (ids are never reused)
+        rows = conn.execute("SELECT id, name FROM subjects").fetchall()
+        self.subjects = [None] * (max((row[0] for row in rows), default=-1) + 1)
+        for subject_id, subject in rows:
+            self.subjects[subject_id] = subject
+        self._codes = {subject: subject_id for subject_id, subject in rows}
+
+    def _fetch(self, conn, where, params):
+        # Plain integer columns, so each chunk converts to an array in one call
+        cursor = conn.execute(f"""
+            SELECT id, student_id, subject_id, COALESCE(day - {DAY_ZERO}, {NO_DAY}),
+                   (status_id = {STATUS_IDS['Absent']}) + 2 * (status_id = {STATUS_IDS['Leave']})
+            FROM attendance WHERE {where} ORDER BY id
+        """, params)
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(LOAD_CHUNK)
+            if not rows:
+                break
+            chunks.append(np.array(rows, dtype=np.int64))
+        if not chunks:
+            return np.zeros((0, 5), np.int64)
+        return np.concatenate(chunks)
+
+    @staticmethod
+    def _split(rows):
+        # Fetched rows -> (ids, students, subject_codes, days, statuses)
+        return (rows[:, 0].copy(), rows[:, 1].astype(np.int32), rows[:, 2].astype(np.int16),
+                rows[:, 3].astype(np.int16), rows[:, 4].astype(np.uint8))
+
+    def _count(self, columns):
+        _, students, subject_codes, _, statuses = columns
+        counts = np.zeros((3, int(students.max(initial=0)) + 1, max(len(self.subjects), 1)), np.uint32)
+        np.add.at(counts, (statuses, students, subject_codes), 1)
+        return counts
+
+    @staticmethod
+    def _merge_counts(counts, extra):
+        shape = tuple(max(a, b) for a, b in zip(counts.shape, extra.shape))
+        merged = np.zeros(shape, np.uint32)
+        merged[:, :counts.shape[1], :counts.shape[2]] += counts
+        merged[:, :extra.shape[1], :extra.shape[2]] += extra
+        return merged
+
+    @staticmethod
+    def _subtract_counts(counts, stale):
+        # stale only counts rows that are in counts, so it fits inside it
+        students, subjects = min(counts.shape[1], stale.shape[1]), min(counts.shape[2], stale.shape[2])
+        counts = counts.copy()
+        counts[:, :students, :subjects] -= stale[:, :students, :subjects]
+        return counts
+
+    def _positions(self, ids):
+        # Indexes of the given (sorted) attendance ids in the id-ordered columns
+        positions = np.searchsorted(self.ids, ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == ids[found]
+        return positions[found]
+
+    def sync(self, conn):
+        # Bring the columns up to date with the database (cheap when unchanged)
+        with self._lock:
+            started = time.perf_counter()
+            own_transaction = not conn.in_transaction
+            if own_transaction:
+                # Read the version, the change log and the rows from one snapshot
+                conn.execute('BEGIN')
+            try:
+                version = data_version(conn, 'attendance')[0]
+                if version == self.version:
+                    return False
+                self._sync_subjects(conn)
+                if self.version is None or version < self.version or not self._patch(conn, version):
+                    self._reload(conn, version)
+            finally:
+                if own_transaction:
+                    conn.execute('COMMIT')
+            self.last_sync_ms = (time.perf_counter() - started) * 1000
+            return True
+
+    def _reload(self, conn, version):
+        self.change_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM attendance_changes").fetchone()[0]
+        rows = self._fetch(conn, 'id > ?', (0,))
+        columns = self._split(rows)
+        self._publish(columns, self._count(columns), version)
+        self.high_water = int(rows[-1, 0]) if len(rows) else 0
+        self.full_loads += 1
+
+    def _patch(self, conn, version):
+        # Apply the writes since self.version in place of a reload; False
+        # when they do not account for every version bump (the log was
+        # trimmed, a migration rewrote the table, ids were changed)
+        changes = conn.execute(
+            "SELECT seq, attendance_id FROM attendance_changes WHERE seq > ? ORDER BY seq", (self.change_seq,)
+        ).fetchall()
+        added = self._fetch(conn, 'id > ?', (self.high_water,))
+        changed = np.unique(np.array([row[1] for row in changes], np.int64))
+        # Each logged change is one write, each appended row another, and so
+        # is the insert of a row that was deleted again before this sync
+        vanished = np.setdiff1d(changed[changed > self.high_water], added[:, 0])
+        if len(changes) + len(added) + len(vanished) != version - self.version:
+            return False
+
+        columns = (self.ids, self.students, self.subject_codes, self.days, self.statuses)
+        counts = self.counts
+        positions = self._positions(changed[changed <= self.high_water])
+        if len(positions):
+            # Take the old marks out, overwrite the rows still in the table
+            # and drop the deleted ones
+            current = self._fetch(
+                conn, 'id IN (SELECT attendance_id FROM attendance_changes WHERE seq > ?) AND id <= ?',
+                (self.change_seq, self.high_water)
+            )
+            old = tuple(column[positions] for column in columns)
+            current = current[np.isin(current[:, 0], old[0])]
+            fresh = self._split(current)
+            kept = np.isin(old[0], fresh[0])
+            counts = self._merge_counts(self._subtract_counts(counts, self._count(old)), self._count(fresh))
+            columns = tuple(column.copy() for column in columns)
+            for column, values in zip(columns[1:], fresh[1:]):
+                column[positions[kept]] = values
+            if not kept.all():
+                columns = tuple(np.delete(column, positions[~kept]) for column in columns)
+        if len(added):
+            fresh = self._split(added)
+            columns = tuple(np.concatenate(pair) for pair in zip(columns, fresh))
+            counts = self._merge_counts(counts, self._count(fresh))
+            self.high_water = int(added[-1, 0])
+            self.appends += 1
+        if changes:
+            self.change_seq = changes[-1][0]
+            self.patches += 1
+        self._publish(columns, counts, version)
+        return True
+
+    def _publish(self, columns, counts, version):
+        # New arrays replace the old ones; readers hold the lock while they
+        # use them, so they never see half a sync
+        self.ids, self.students, self.subject_codes, self.days, self.statuses = columns
+        self.counts = counts
+        self.version = version
+
+    # --- Aggregates ---
+
+    def totals(self, subject=None, since=None):
+        # (present, absent, leave, total) arrays indexed by student id.
+        # since (a date) is answered from the raw columns, the rest from counts.
+        with self._lock:
+            return self._totals(subject, since)
+
+    def _totals(self, subject, since):
+        counts = self.counts
+        code = self._codes.get(subject) if subject is not None else None
+        if since is not None:
+            day = since.toordinal() - ORDINAL_ZERO
+            mask = self.days >= day
+            if subject is not None:
+                mask &= self.subject_codes == (code if code is not None else -1)
+            size = counts.shape[1]
+            by_status = [np.bincount(self.students[mask & (self.statuses == s)], minlength=size) for s in range(3)]
+            present, absent, leave = by_status
+            return present, absent, leave, present + absent + leave
+        if subject is None:
+            per_status = counts.sum(axis=2, dtype=np.int64)
+        elif code is not None and code < counts.shape[2]:
+            per_status = counts[:, :, code].astype(np.int64)
+        else:
+            per_status = np.zeros(counts.shape[:2], np.int64)
+        present, absent, leave = per_status
+        return present, absent, leave, present + absent + leave
+
+    def student_rows(self, student_ids, subject=None):
+        # {student_id: (present, absent, total)} for the given students
+        present, absent, _, total = self.totals(subject)
+        size = len(total)
+        return {
+            student_id: (int(present[student_id]), int(absent[student_id]), int(total[student_id]))
+            if 0 <= student_id < size else (0, 0, 0)
+            for student_id in student_ids
+        }
+
+    def report_counts(self):
+        # Students under 75% and at 100%, over everyone with marks
+        present, _, _, total = self.totals()
+        marked = total > 0
+        percentage = present[marked] * 100.0 / total[marked]
+        return int((percentage < 75).sum()), int((percentage == 100).sum())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rows': int(len(self.students)),
+                'subjects': len(self._codes),
+                'high_water': self.high_water,
+                'version': self.version,
+                'full_loads': self.full_loads,
+                'appends': self.appends,
+                'patches': self.patches,
+                'change_seq': self.change_seq,
+                'last_sync_ms': round(self.last_sync_ms, 2),
+                'bytes': int(self.ids.nbytes + self.students.nbytes + self.subject_codes.nbytes + self.days.nbytes
+                             + self.statuses.nbytes + self.counts.nbytes),
+            }
@@ -1,29 +1,269 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, g, make_response
+from flask import Flask, render_template, stream_template, request, redirect, url_for, session, flash, g, jsonify, Response, stream_with_context
 import sqlite3
-from werkzeug.security import generate_password_hash, check_password_hash
-from functools import wraps
+from functools import partial, wraps
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import date, datetime, timedelta
 import json
+import hashlib
 import csv
 from io import StringIO
+from itertools import groupby
+from operator import itemgetter
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from database import ATTENDANCE_STATUSES, STATUS_IDS, day_number, parse_date, migrate, upsert_attendance, record_subject_assignments, data_version
+from db_pool import ConnectionPool
+from cache import VersionedCache
+from kpi import KpiSnapshots
+from hashing import PasswordHasher, HashQueueFull
+from throttle import Throttle
+import importer
+from analytics import ColumnarAnalytics, available as columnar_available
+from defaulters import DefaulterLists, parse_threshold
+from sqlstats import InstrumentedConnection, QueryLog, QueryStats
+from sessions import SqliteSessionStore, profile
 
 app = Flask(__name__)
 app.secret_key = 'a_very_secret_key_for_production'
 DATABASE = 'database.db'
+DB_POOL_SIZE = 8
+EXPORT_CHUNK_SIZE = 500
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+STUDENT_STATS_TTL = 30  # seconds; bounds staleness across worker processes
+NOTICES_PAGE_SIZE = 10
+KPI_REFRESH_INTERVAL = 60  # seconds between background dashboard refreshes
+KPI_REFRESH_WRITES = 100   # ...or refresh sooner after this many writes
+PASSWORD_HASH_WORKERS = 2  # processes doing pbkdf2 work per app worker
+PASSWORD_HASH_QUEUE = 32   # hashes allowed to wait before answering "busy"
+LOGIN_IP_LIMIT = (60, 60)          # failed logins (and, separately, signups) per client IP per 60 s
+LOGIN_ACCOUNT_LIMIT = (5, 300)     # failed logins per account per 5 min
+PROXY_HOPS = 0  # reverse proxies in front of the app that set X-Forwarded-For (0: use the socket address)
+IMPORT_HASH_WORKERS = 2  # processes hashing passwords during a CSV import
+COLUMNAR_ANALYTICS = True  # NumPy engine for report aggregates (only if NumPy is installed)
+SLOW_QUERY_MS = 100  # statements slower than this are logged with their plan
+DEFAULTER_THRESHOLD = 75  # percent; default cut-off for the defaulter list
+SESSION_LIFETIME = timedelta(days=14)  # idle time before a login session expires
+ANONYMOUS_SESSION_LIFETIME = 3600    # seconds; logged-out sessions only carry flash messages
+_pool = None
+_pool_lock = threading.Lock()
+faculty_cache = VersionedCache()
+student_stats_cache = VersionedCache(ttl=STUDENT_STATS_TTL, max_entries=20000)
+notices_cache = VersionedCache(max_entries=256)
+roster_cache = VersionedCache(max_entries=1024)
+name_cache = VersionedCache(max_entries=1)
+password_hasher = PasswordHasher(workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_QUEUE)
+ip_throttle = Throttle(*LOGIN_IP_LIMIT)
+account_throttle = Throttle(*LOGIN_ACCOUNT_LIMIT)
+kpi_snapshots = KpiSnapshots(lambda: get_pool().acquire(), lambda conn: get_pool().release(conn),
+                             interval=KPI_REFRESH_INTERVAL, write_threshold=KPI_REFRESH_WRITES)
+sql_stats = QueryStats(slow_ms=SLOW_QUERY_MS)
+analytics = ColumnarAnalytics() if COLUMNAR_ANALYTICS and columnar_available() else None
+defaulter_lists = DefaulterLists()
+app.permanent_session_lifetime = SESSION_LIFETIME
+if PROXY_HOPS:
+    # remote_addr comes from X-Forwarded-For, trusting only the entries our own
+    # proxies added; without this every client behind the proxy shares one IP
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
 
 # --- Database Connection ---
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.database != DATABASE:
+            if _pool is not None:
+                _pool.close_all()
+            pool = ConnectionPool(DATABASE, size=DB_POOL_SIZE)
+            # Upgrade databases created by older versions (adds indexes etc.)
+            conn = pool.acquire()
+            try:
+                migrate(conn)
+            finally:
+                pool.release(conn)
+            _pool = pool
+    return _pool
+
 def get_db():
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
+        conn = get_pool().acquire()
+        conn.row_factory = sqlite3.Row
+        db = g._database = InstrumentedConnection(conn, g.setdefault('_query_log', QueryLog()))
     return db
 
+# Sessions live in the database; routes read the cached profile from `session`
+session_store = app.session_interface = SqliteSessionStore(get_db, anonymous_lifetime=ANONYMOUS_SESSION_LIFETIME)
+
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+    g._endpoint = request.endpoint
+
+@app.after_request
+def add_server_timing(response):
+    # Streamed responses only include the work done before the first chunk
+    parts = []
+    log = g.get('_query_log')
+    if log is not None:
+        parts.append(f'db;dur={log.total_ms:.1f};desc="{len(log)} queries"')
+    if '_request_started' in g:
+        parts.append(f'app;dur={(time.perf_counter() - g._request_started) * 1000:.1f}')
+    if parts:
+        response.headers['Server-Timing'] = ', '.join(parts)
+    return response
+
+def finish_request(state):
+    # Record the request's SQL stats and hand its connection back to the pool
+    db = state.pop('_database', None)
+    try:
+        if '_request_started' in state:
+            request_ms = (time.perf_counter() - state._request_started) * 1000
+            sql_stats.record(state.get('_endpoint'), state.get('_query_log') or QueryLog(), request_ms,
+                             db.connection if db is not None else None)
+    finally:
+        if db is not None:
+            get_pool().release(db.connection)
+
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    if g.get('_streaming'):
+        # Finished when the streamed response is closed (see streamed())
+        return
+    finish_request(g)
+
+def iter_chunks(cursor, size=EXPORT_CHUNK_SIZE):
+    # Walk a cursor in fixed-size batches so large exports never sit in memory
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+        yield rows
+
+def get_faculty_names(db):
+    # Maps (subject, class_name) and subject to the teaching faculty's name
+    def load():
+        names = {}
+        # Lowest id wins for a subject, as the old "LIMIT 1" lookups did
+        for row in db.execute("SELECT subject, full_name FROM users WHERE role='faculty' AND subject IS NOT NULL ORDER BY id DESC"):
+            names[row['subject']] = row['full_name']
+        for row in db.execute("""
+            SELECT sa.subject, sa.class_name, u.full_name
+            FROM subject_assignments sa
+            JOIN users u ON u.id = sa.faculty_id
+        """):
+            names[(row['subject'], row['class_name'])] = row['full_name']
+        return names
+    return faculty_cache.get('faculty', data_version(db, 'users', 'subject_assignments'), load)
+
+def faculty_for(names, subject, class_name=None):
+    return names.get((subject, class_name)) or names.get(subject)
+
+def get_roster(db, class_name):
+    # Students of a class in roll-number order; reloaded after any users write
+    def load():
+        rows = db.execute("""
+            SELECT id, roll_number, full_name, class_name
+            FROM users
+            WHERE role='student' AND class_name=?
+            ORDER BY roll_number
+        """, (class_name,)).fetchall()
+        return [dict(r) for r in rows]
+    return roster_cache.get(class_name, data_version(db, 'users'), load)
+
+def get_names(db):
+    # ({subject_id: name}, {status_id: name}) to turn attendance rows back
+    # into names; reloaded when a subject is added
+    def load():
+        return ({row[0]: row[1] for row in db.execute('SELECT id, name FROM subjects')},
+                {row[0]: row[1] for row in db.execute('SELECT id, name FROM statuses')})
+    return name_cache.get('names', data_version(db, 'subjects'), load)
+
+def get_analytics(db):
+    # The columnar engine, synced with the database, or None to use SQL
+    if analytics is None:
+        return None
+    analytics.sync(db)
+    return analytics
+
+def get_classes(db, subject=None):
+    # Classes the subject is taught to, falling back to every class
+    rows = []
+    if subject:
+        rows = db.execute(
+            "SELECT class_name FROM subject_assignments WHERE subject = ? ORDER BY class_name", (subject,)
+        ).fetchall()
+    if not rows:
+        rows = db.execute("SELECT class_name FROM classes ORDER BY class_name").fetchall()
+    return rows
+
+def load_student_stats(db, student_id):
+    # Dashboard numbers from the student's attendance_summary rows (one
+    # primary-key range read)
+    rows = db.execute("""
+        SELECT subject, present, absent, leave, total
+        FROM attendance_summary
+        WHERE student_id = ?
+        ORDER BY subject
+    """, (student_id,)).fetchall()
+    total_days = sum(r['total'] for r in rows)
+    present_days = sum(r['present'] for r in rows)
+    return {
+        'total_days': total_days,
+        'present_days': present_days,
+        'absent_days': sum(r['absent'] for r in rows),
+        'leave_days': sum(r['leave'] for r in rows),
+        'attendance_percentage': int(present_days / total_days * 100) if total_days > 0 else 0,
+        'subject_performance': [
+            {"name": r['subject'], "percentage": int(r['present'] / r['total'] * 100) if r['total'] > 0 else 0}
+            for r in rows
+        ],
+    }
+
+def get_student_stats(db, student_id):
+    # Cached briefly and dropped when the student's attendance is marked
+    return student_stats_cache.get(student_id, 0, lambda: load_student_stats(db, student_id))
+
+def get_notices(db, page=1, per_page=NOTICES_PAGE_SIZE):
+    # One page of notices, newest first, plus whether an older page exists.
+    # Pages are shared by every user until a notice is created or deleted.
+    def load():
+        rows = db.execute(
+            "SELECT * FROM notices ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (per_page + 1, (page - 1) * per_page)
+        ).fetchall()
+        return [dict(r) for r in rows[:per_page]], len(rows) > per_page
+    return notices_cache.get((page, per_page), data_version(db, 'notices'), load)
+
+def notices_page_arg():
+    page = request.args.get('notices_page', 1, type=int)
+    return max(page, 1)
+
+def attendance_changed(student_ids):
+    for student_id in student_ids:
+        student_stats_cache.invalidate(student_id)
+
+def buffered(pieces, size=16384):
+    # Streamed templates yield many tiny strings; send them in ~16 KB writes
+    buffer, length = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+def streamed(pieces, **kwargs):
+    # Teardown runs when the view returns, before a streamed body is sent, so
+    # the request connection is released when the server closes the response
+    # instead. That also happens when the body is never read (HEAD requests,
+    # clients that disconnect before the first chunk).
+    g._streaming = True
+    response = Response(stream_with_context(pieces), **kwargs)
+    response.call_on_close(partial(finish_request, g._get_current_object()))
+    return response
 
 # --- Decorators ---
 def login_required(f):
@@ -82,13 +322,34 @@ def auth():
             return redirect(url_for('student_dashboard'))
     return render_template('auth.html')
 
+def client_ip():
+    # The real client behind PROXY_HOPS trusted proxies (see ProxyFix above)
+    return request.remote_addr or 'unknown'
+
+def throttled(*checks):
+    # checks: (throttle, key) pairs; flashes and returns True when over a limit
+    retry = max(throttle.retry_after(key) for throttle, key in checks)
+    if retry:
+        flash(f"Too many attempts. Please try again in {retry} seconds.", "error")
+        return True
+    return False
+
 @app.route('/signup', methods=['POST'])
 def signup():
     full_name = request.form['full_name']
     email = request.form['email']
     password = request.form['password']
     role = request.form['role']
-    hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+    # Signups are counted on their own key so they never use up the login budget
+    signup_key = f"signup:{client_ip()}"
+    if throttled((ip_throttle, signup_key)):
+        return redirect(url_for('auth'))
+    ip_throttle.hit(signup_key)
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HashQueueFull:
+        flash("The server is busy. Please try again in a moment.", "error")
+        return redirect(url_for('auth'))
     db = get_db()
     try:
         db.execute("INSERT INTO users (full_name, email, password, role) VALUES (?, ?, ?, ?)",
@@ -103,14 +364,24 @@ def signup():
 def login():
     email = request.form['email']
     password = request.form['password']
+    # Refuse over-limit clients/accounts before spending any hashing time
+    # Only failures are counted, so a lecture hall logging in at once behind
+    # one NAT address is never throttled
+    if throttled((ip_throttle, client_ip()), (account_throttle, email.lower())):
+        return redirect(url_for('auth'))
+
     db = get_db()
     user = db.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+    try:
+        valid = bool(user) and password_hasher.check(user['password'], password)
+    except HashQueueFull:
+        flash("The server is busy. Please try again in a moment.", "error")
+        return redirect(url_for('auth'))
    
-    if user and check_password_hash(user['password'], password):
+    if valid:
+        account_throttle.reset(email.lower())
         session.clear()
-        session['user_id'] = user['id']
-        session['user_name'] = user['full_name']
-        session['user_role'] = user['role']
+        session.update(profile(user))
        
         if user['role'] == 'admin':
             flash(f"Welcome back, {user['full_name']}!", "success")
@@ -125,6 +396,8 @@ def login():
             flash("Invalid user role.", "error")
             return redirect(url_for('auth'))
     else:
+        ip_throttle.hit(client_ip())
+        account_throttle.hit(email.lower())
         flash("Invalid email or password. Please try again.", "error")
         return redirect(url_for('auth'))
 
@@ -143,37 +416,18 @@ from datetime import date
 def student_dashboard():
     db = get_db()
     # Notices
-    notices = db.execute("SELECT * FROM notices ORDER BY created_at DESC").fetchall()
-    # Attendance records
-    records = db.execute("SELECT status, subject FROM attendance WHERE student_id = ?", (session['user_id'],)).fetchall()
-    total_days = len(records)
-    present_days = sum(1 for r in records if r['status'] == 'Present')
-    absent_days = sum(1 for r in records if r['status'] == 'Absent')
-    leave_days = sum(1 for r in records if r['status'] == 'Leave')
-    attendance_percentage = int(present_days / total_days * 100) if total_days > 0 else 0
-
-    subjects = {}
-    for r in records:
-        subj = r['subject']
-        subjects.setdefault(subj, {'present': 0, 'total': 0})
-        subjects[subj]['total'] += 1
-        if r['status'] == 'Present':
-            subjects[subj]['present'] += 1
-    subject_performance = [
-        {"name": name, "percentage": int(data['present'] / data['total'] * 100) if data['total'] > 0 else 0}
-        for name, data in subjects.items()
-    ]
+    notices_page = notices_page_arg()
+    notices, more_notices = get_notices(db, notices_page)
+    # Attendance stats
+    stats = get_student_stats(db, session['user_id'])
 
     current_date = date.today().strftime("%B %d, %Y")
     return render_template('dashboard.html',
         notices=notices,
-        total_days=total_days,
-        present_days=present_days,
-        absent_days=absent_days,
-        leave_days=leave_days,
-        attendance_percentage=attendance_percentage,
-        subject_performance=subject_performance,
-        current_date=current_date
+        notices_page=notices_page,
+        more_notices=more_notices,
+        current_date=current_date,
+        **stats
     )
 
 
@@ -192,8 +446,8 @@ def update_profile():
     db = get_db()
     db.execute('UPDATE users SET full_name = ?, email = ? WHERE id = ?',
               (new_full_name, new_email, session['user_id']))
+    session_store.refresh_user(db, session['user_id'], session)
     db.commit()
-    session['user_name'] = new_full_name
     flash('Profile details updated successfully!', 'success')
     return redirect(url_for('student_profile'))
 
@@ -208,56 +462,158 @@ def update_password():
         flash('New passwords do not match.', 'error')
         return redirect(url_for('student_profile'))
 
+    if throttled((account_throttle, f"user:{session['user_id']}")):
+        return redirect(url_for('student_profile'))
+
     db = get_db()
     user = db.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],)).fetchone()
 
-    if not check_password_hash(user['password'], current_password):
-        flash('Incorrect current password.', 'error')
+    try:
+        if not password_hasher.check(user['password'], current_password):
+            account_throttle.hit(f"user:{session['user_id']}")
+            flash('Incorrect current password.', 'error')
+            return redirect(url_for('student_profile'))
+        new_hashed_password = password_hasher.hash(new_password)
+    except HashQueueFull:
+        flash('The server is busy. Please try again in a moment.', 'error')
         return redirect(url_for('student_profile'))
-
-    new_hashed_password = generate_password_hash(new_password, method='pbkdf2:sha256')
     db.execute('UPDATE users SET password = ? WHERE id = ?',
               (new_hashed_password, session['user_id']))
     db.commit()
     flash('Password changed successfully!', 'success')
     return redirect(url_for('student_profile'))
 
+def history_filters(args):
+    # start_date/end_date/status/subject filters shared by the history views
+    # (dates become attendance.day ranges; unparseable dates are ignored)
+    clauses, params = [], []
+    start_day = day_number(args.get('start_date', ''))
+    end_day = day_number(args.get('end_date', ''))
+    if start_day is not None:
+        clauses.append("a.day >= ?")
+        params.append(start_day)
+    if end_day is not None:
+        clauses.append("a.day <= ?")
+        params.append(end_day)
+    if args.get('status'):
+        clauses.append("a.status_id = (SELECT id FROM statuses WHERE name = ?)")
+        params.append(args['status'])
+    if args.get('subject'):
+        clauses.append("a.subject_id = (SELECT id FROM subjects WHERE name = ?)")
+        params.append(args['subject'])
+    return clauses, params
+
+def parse_history_cursor(value):
+    # Cursors look like "YYYY-MM-DD:id", the (date, id) of the last row shown;
+    # returned as (day, id)
+    try:
+        cursor_date, cursor_id = value.rsplit(':', 1)
+        cursor_day = day_number(cursor_date)
+        return (cursor_day, int(cursor_id)) if cursor_day is not None else None
+    except (AttributeError, ValueError):
+        return None
+
+def fetch_history_page(db, student_id, args):
+    # Keyset pagination on (day, id): each page is an index range scan, so
+    # its cost does not depend on how much history the student has
+    try:
+        page_size = int(args.get('page_size', HISTORY_PAGE_SIZE))
+    except ValueError:
+        page_size = HISTORY_PAGE_SIZE
+    page_size = max(1, min(page_size, HISTORY_MAX_PAGE_SIZE))
+
+    clauses, params = history_filters(args)
+    query = "SELECT a.id, a.date, a.subject_id, a.status_id FROM attendance a WHERE a.student_id = ?"
+    params = [student_id] + params
+    if clauses:
+        query += " AND " + " AND ".join(clauses)
+    cursor = parse_history_cursor(args.get('before'))
+    if cursor:
+        query += " AND (a.day, a.id) < (?, ?)"
+        params.extend(cursor)
+    query += " ORDER BY a.day DESC, a.id DESC LIMIT ?"
+    params.append(page_size + 1)
+    rows = db.execute(query, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = f"{rows[-1]['date']}:{rows[-1]['id']}"
+
+    if student_id == session.get('user_id'):
+        class_name = session.get('user_class')  # cached in the session at login
+    else:
+        student = db.execute('SELECT class_name FROM users WHERE id = ?', (student_id,)).fetchone()
+        class_name = student['class_name'] if student else None
+    faculty_names = get_faculty_names(db)
+    subjects, statuses = get_names(db)
+    records = []
+    for r in rows:
+        subject = subjects.get(r['subject_id'])
+        records.append({'id': r['id'], 'date': r['date'], 'subject': subject, 'status': statuses.get(r['status_id']),
+                        'faculty': faculty_for(faculty_names, subject, class_name)})
+    return records, next_cursor
+
+def history_stats(db, student_id, args):
+    # Totals for the whole filtered history, not just the current page
+    clauses, params = history_filters(args)
+    if not any(clause.startswith('a.day') for clause in clauses):
+        query = """
+            SELECT COALESCE(SUM(total), 0) as total, COALESCE(SUM(present), 0) as present,
+                   COALESCE(SUM(absent), 0) as absent, COALESCE(SUM(leave), 0) as leave
+            FROM attendance_summary WHERE student_id = ?
+        """
+        params = [student_id]
+        if args.get('subject'):
+            query += " AND subject = ?"
+            params.append(args['subject'])
+        stats = dict(db.execute(query, params).fetchone())
+        status = args.get('status')
+        if status:
+            # Only the filtered status remains; it is also the total
+            matched = stats[status.lower()] if status in ATTENDANCE_STATUSES else 0
+            stats = {'total': matched, 'present': 0, 'absent': 0, 'leave': 0}
+            if matched:
+                stats[status.lower()] = matched
+        return stats
+
+    query = f"""
+        SELECT COUNT(*) as total,
+               COALESCE(SUM(a.status_id = {STATUS_IDS['Present']}), 0) as present,
+               COALESCE(SUM(a.status_id = {STATUS_IDS['Absent']}), 0) as absent,
+               COALESCE(SUM(a.status_id = {STATUS_IDS['Leave']}), 0) as leave
+        FROM attendance a WHERE a.student_id = ? AND 
+    """ + " AND ".join(clauses)
+    return dict(db.execute(query, [student_id] + params).fetchone())
+
 @app.route('/attendance_history')
 @login_required
 def attendance_history():
     db = get_db()
-    query = """
-        SELECT a.*, 
-            (SELECT full_name FROM users WHERE role = 'faculty' AND subject = a.subject LIMIT 1) AS faculty
-        FROM attendance a
-        WHERE a.student_id = ?
-    """
-    params = [session['user_id']]
-    # Get filters
-    start_date = request.args.get('start_date')
-    end_date = request.args.get('end_date')
-    status = request.args.get('status')
-    subject = request.args.get('subject')
-
-    if start_date:
-        query += " AND a.date >= ?"
-        params.append(start_date)
-    if end_date:
-        query += " AND a.date <= ?"
-        params.append(end_date)
-    if status:
-        query += " AND a.status = ?"
-        params.append(status)
-    if subject:
-        query += " AND a.subject = ?"
-        params.append(subject)
-
-    query += " ORDER BY a.date DESC"
-    records = db.execute(query, tuple(params)).fetchall()
+    records, next_cursor = fetch_history_page(db, session['user_id'], request.args)
+    stats = history_stats(db, session['user_id'], request.args)
 
-    all_records = db.execute("SELECT DISTINCT subject FROM attendance WHERE student_id = ?", (session['user_id'],)).fetchall()
+    all_records = db.execute("SELECT subject FROM attendance_summary WHERE student_id = ? ORDER BY subject", (session['user_id'],)).fetchall()
     subjects = [row['subject'] for row in all_records]
-    return render_template('attendance_history.html', records=records, subjects=subjects)
+
+    args = request.args.to_dict()
+    args.pop('before', None)
+    next_url = url_for('attendance_history', **args, before=next_cursor) if next_cursor else None
+    first_url = url_for('attendance_history', **args) if request.args.get('before') else None
+    return render_template('attendance_history.html', records=records, subjects=subjects, stats=stats,
+                           next_url=next_url, first_url=first_url)
+
+@app.route('/attendance_history/records')
+@login_required
+def attendance_history_records():
+    # JSON pages for infinite scroll; pass next_cursor back as ?before=
+    db = get_db()
+    records, next_cursor = fetch_history_page(db, session['user_id'], request.args)
+    return jsonify({
+        'records': [{'id': r['id'], 'date': r['date'], 'subject': r['subject'],
+                     'status': r['status'], 'faculty': r['faculty']} for r in records],
+        'next_cursor': next_cursor,
+    })
 
 
 
@@ -267,80 +623,24 @@ def attendance_history():
 @admin_required
 def admin_dashboard():
     db = get_db()
-   
-    total_students = db.execute(
-        "SELECT COUNT(*) as count FROM users WHERE role='student'"
-    ).fetchone()['count']
-   
-    total_faculty = db.execute(
-        "SELECT COUNT(*) as count FROM users WHERE role='faculty'"
-    ).fetchone()['count']
-   
-    total_classes = db.execute(
-        "SELECT COUNT(DISTINCT class_name) as count FROM users WHERE role='student' AND class_name IS NOT NULL"
-    ).fetchone()['count']
-   
-    total_records = db.execute("SELECT COUNT(*) as count FROM attendance").fetchone()['count']
-    present_records = db.execute(
-        "SELECT COUNT(*) as count FROM attendance WHERE status='Present'"
-    ).fetchone()['count']
-    overall_attendance = round((present_records / total_records * 100) if total_records > 0 else 0, 1)
-   
-    recent_students = db.execute("""
-        SELECT u.id, u.full_name, u.class_name, u.roll_number,
-               COUNT(a.id) as total_classes,
-               SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as present_count
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id
-        WHERE u.role = 'student'
-        GROUP BY u.id
-        ORDER BY u.id DESC
-        LIMIT 5
-    """).fetchall()
-   
-    students_with_attendance = []
-    for student in recent_students:
-        attendance_pct = round(
-            (student['present_count'] / student['total_classes'] * 100)
-            if student['total_classes'] > 0 else 0
-        )
-        students_with_attendance.append({
-            'name': student['full_name'],
-            'class': student['class_name'] or 'N/A',
-            'attendance': attendance_pct
-        })
-   
-    classes_overview = db.execute("""
-        SELECT class_name, COUNT(*) as student_count
-        FROM users
-        WHERE role='student' AND class_name IS NOT NULL
-        GROUP BY class_name
-    """).fetchall()
-   
-    monthly_trend = []
-    for i in range(9, -1, -1):
-        month_date = datetime.now() - timedelta(days=30*i)
-        month_name = month_date.strftime('%b')
-        month_str = month_date.strftime('%Y-%m')
-        month_total = db.execute(
-            "SELECT COUNT(*) as count FROM attendance WHERE date LIKE ?",
-            (f"{month_str}%",)
-        ).fetchone()['count']
-        month_present = db.execute(
-            "SELECT COUNT(*) as count FROM attendance WHERE date LIKE ? AND status='Present'",
-            (f"{month_str}%",)
-        ).fetchone()['count']
-        month_pct = round((month_present / month_total * 100) if month_total > 0 else 0)
-        monthly_trend.append({'month': month_name, 'percentage': month_pct})
-   
+    snapshot = kpi_snapshots.get(db)
+    kpis = snapshot['kpis']
     return render_template('admin_dashboard.html',
-                         total_students=total_students,
-                         total_faculty=total_faculty,
-                         total_classes=total_classes,
-                         overall_attendance=overall_attendance,
-                         recent_students=students_with_attendance,
-                         classes_overview=classes_overview,
-                         monthly_trend=json.dumps(monthly_trend))
+                         total_students=kpis['total_students'],
+                         total_faculty=kpis['total_faculty'],
+                         total_classes=kpis['total_classes'],
+                         overall_attendance=kpis['overall_attendance'],
+                         recent_students=kpis['recent_students'],
+                         classes_overview=kpis['classes_overview'],
+                         monthly_trend=json.dumps(kpis['monthly_trend']),
+                         data_as_of=snapshot['as_of'].strftime('%B %d, %Y at %I:%M:%S %p'))
+
+@app.route('/admin/dashboard/refresh', methods=['POST'])
+@admin_required
+def refresh_admin_dashboard():
+    kpi_snapshots.refresh(get_db())
+    flash('Dashboard data refreshed.', 'success')
+    return redirect(url_for('admin_dashboard'))
 
 @app.route('/admin/users')
 @admin_required
@@ -349,10 +649,10 @@ def admin_users():
     # All students with their attendance summary
     students = db.execute("""
         SELECT u.id, u.full_name, u.email, u.class_name, u.roll_number,
-               COUNT(a.id) as total_classes,
-               SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as present_count
+               COALESCE(SUM(s.total), 0) as total_classes,
+               COALESCE(SUM(s.present), 0) as present_count
         FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id
+        LEFT JOIN attendance_summary s ON u.id = s.student_id
         WHERE u.role = 'student'
         GROUP BY u.id
         ORDER BY u.roll_number
@@ -387,28 +687,45 @@ def admin_users():
 def admin_classes():
     db = get_db()
     classes = db.execute("""
-        SELECT DISTINCT u.class_name, a.subject,
-            (SELECT full_name FROM users WHERE role='faculty' AND subject = a.subject LIMIT 1) as faculty,
+        SELECT u.class_name, s.subject,
             COUNT(DISTINCT u.id) as total_students
         FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id AND a.subject IS NOT NULL
+        LEFT JOIN attendance_summary s ON u.id = s.student_id
         WHERE u.role='student' AND u.class_name IS NOT NULL
-        GROUP BY u.class_name, a.subject
+        GROUP BY u.class_name, s.subject
         ORDER BY u.class_name
     """).fetchall()
+    faculty_names = get_faculty_names(db)
+    classes = [dict(c, faculty=faculty_for(faculty_names, c['subject'], c['class_name'])) for c in classes]
 
-    attendance_records = db.execute("""
-        SELECT u.full_name as student_name, u.class_name, u.roll_number as roll_no,
-            SUM(CASE WHEN a.status='Present' THEN 1 ELSE 0 END) as presents,
-            SUM(CASE WHEN a.status='Absent' THEN 1 ELSE 0 END) as absents,
-            COUNT(a.id) as total,
-            ROUND(SUM(CASE WHEN a.status='Present' THEN 1 ELSE 0 END)*100.0/COUNT(a.id),1) as percentage
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id
-        WHERE u.role='student'
-        GROUP BY u.id
-        ORDER BY u.class_name, u.roll_number
-    """).fetchall()
+    engine = get_analytics(db)
+    if engine is not None:
+        students = db.execute("""
+            SELECT id, full_name as student_name, class_name, roll_number as roll_no
+            FROM users
+            WHERE role='student'
+            ORDER BY class_name, roll_number
+        """).fetchall()
+        counts = engine.student_rows([s['id'] for s in students])
+        attendance_records = []
+        for student in students:
+            presents, absents, total = counts[student['id']]
+            attendance_records.append(dict(
+                student, presents=presents, absents=absents, total=total,
+                percentage=round(presents * 100.0 / total, 1) if total else None))
+    else:
+        attendance_records = db.execute("""
+            SELECT u.full_name as student_name, u.class_name, u.roll_number as roll_no,
+                COALESCE(SUM(s.present), 0) as presents,
+                COALESCE(SUM(s.absent), 0) as absents,
+                COALESCE(SUM(s.total), 0) as total,
+                ROUND(SUM(s.present)*100.0/SUM(s.total),1) as percentage
+            FROM users u
+            LEFT JOIN attendance_summary s ON u.id = s.student_id
+            WHERE u.role='student'
+            GROUP BY u.id
+            ORDER BY u.class_name, u.roll_number
+        """).fetchall()
     
     class_list = sorted(set([c['class_name'] for c in classes if c['class_name']]))
     return render_template('admin_classes.html',
@@ -421,14 +738,17 @@ def admin_classes():
 def view_class(class_name, subject):
     db = get_db()
     # Query details for students in this class for the given subject
-    class_students = db.execute("""
-        SELECT u.full_name, u.roll_number, a.status, a.date
+    rows = db.execute("""
+        SELECT u.full_name, u.roll_number, a.status_id, a.date
         FROM users u
         LEFT JOIN attendance a
-            ON u.id = a.student_id AND a.subject = ?
+            ON u.id = a.student_id AND a.subject_id = (SELECT id FROM subjects WHERE name = ?)
         WHERE u.class_name = ?
         ORDER BY u.roll_number, a.date
     """, (subject, class_name)).fetchall()
+    statuses = get_names(db)[1]
+    class_students = [{'full_name': r['full_name'], 'roll_number': r['roll_number'],
+                       'status': statuses.get(r['status_id']), 'date': r['date']} for r in rows]
     return render_template('class_details.html', students=class_students, class_name=class_name, subject=subject)
 
 @app.route('/admin/class/add', methods=['GET', 'POST'])
@@ -436,17 +756,40 @@ def view_class(class_name, subject):
 def add_class():
     db = get_db()
     if request.method == 'POST':
-        class_name = request.form['class_name']
-        subject = request.form['subject']
-        faculty = request.form['faculty']
-        db.execute(
-            "INSERT INTO classes (class_name, subject, faculty) VALUES (?, ?, ?)",
-            (class_name, subject, faculty)
-        )
+        class_name = request.form['class_name'].strip()
+        subject = request.form['subject'].strip()
+        faculty = request.form['faculty'].strip()
+        # The faculty field takes a faculty member's name or email
+        teacher = db.execute(
+            "SELECT id FROM users WHERE role='faculty' AND (full_name = ? OR email = ?) ORDER BY id LIMIT 1",
+            (faculty, faculty)
+        ).fetchone()
+        if teacher is None:
+            flash(f'No faculty member named "{faculty}".', 'error')
+            return render_template('admin_add_class.html', weekdays=WEEKDAYS)
+        # Optional weekly slot, on top of the class's default timetable slots
+        slot = None
+        day = request.form.get('day_of_week', '')
+        if day:
+            start, end = request.form.get('start_time', ''), request.form.get('end_time', '')
+            if not (day.isdigit() and int(day) < len(WEEKDAYS) and valid_time(start) and valid_time(end) and start < end):
+                flash('Please give the lecture slot a day and a start time before its end time (HH:MM).', 'error')
+                return render_template('admin_add_class.html', weekdays=WEEKDAYS)
+            slot = (class_name, subject, int(day), start, end)
+        db.execute("INSERT OR IGNORE INTO classes (class_name) VALUES (?)", (class_name,))
+        db.execute("""
+            INSERT INTO subject_assignments (subject, class_name, faculty_id) VALUES (?, ?, ?)
+            ON CONFLICT (subject, class_name) DO UPDATE SET faculty_id = excluded.faculty_id
+        """, (subject, class_name, teacher['id']))
+        if slot:
+            db.execute(
+                "INSERT OR IGNORE INTO timetable (class_name, subject, day_of_week, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+                slot
+            )
         db.commit()
         flash('Class added successfully!', 'success')
         return redirect(url_for('admin_classes'))
-    return render_template('admin_add_class.html')
+    return render_template('admin_add_class.html', weekdays=WEEKDAYS)
 
 # For any page that has filter forms:
 @app.route('/admin/users/filter')
@@ -474,11 +817,10 @@ def admin_classes_filter():
     class_filter = request.args.get('class', '')
     subject_filter = request.args.get('subject', '')
     base_query = """
-        SELECT DISTINCT u.class_name, a.subject,
-            (SELECT full_name FROM users WHERE role='faculty' AND subject = a.subject LIMIT 1) as faculty,
+        SELECT u.class_name, s.subject,
             COUNT(DISTINCT u.id) as total_students
         FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id AND a.subject IS NOT NULL
+        LEFT JOIN attendance_summary s ON u.id = s.student_id
         WHERE u.role='student' AND u.class_name IS NOT NULL
     """
     filters = []
@@ -487,12 +829,14 @@ def admin_classes_filter():
         filters.append("u.class_name = ?")
         params.append(class_filter)
     if subject_filter:
-        filters.append("a.subject = ?")
+        filters.append("s.subject = ?")
         params.append(subject_filter)
     if filters:
         base_query += " AND " + " AND ".join(filters)
-    base_query += " GROUP BY u.class_name, a.subject ORDER BY u.class_name"
+    base_query += " GROUP BY u.class_name, s.subject ORDER BY u.class_name"
     classes = db.execute(base_query, tuple(params)).fetchall()
+    faculty_names = get_faculty_names(db)
+    classes = [dict(c, faculty=faculty_for(faculty_names, c['subject'], c['class_name'])) for c in classes]
     return render_template('admin_classes.html', classes=classes)
 
 @app.route('/admin/reports')
@@ -500,46 +844,93 @@ def admin_classes_filter():
 def admin_reports():
     db = get_db()
    
-    notices = db.execute('SELECT * FROM notices ORDER BY created_at DESC').fetchall()
+    notices_page = notices_page_arg()
+    notices, more_notices = get_notices(db, notices_page)
     total_classes = db.execute(
         "SELECT COUNT(DISTINCT class_name) as count FROM users WHERE class_name IS NOT NULL"
     ).fetchone()['count']
    
-    total_records = db.execute("SELECT COUNT(*) as count FROM attendance").fetchone()['count']
-    present_records = db.execute(
-        "SELECT COUNT(*) as count FROM attendance WHERE status='Present'"
-    ).fetchone()['count']
+    totals = db.execute(
+        "SELECT COALESCE(SUM(total), 0) as total, COALESCE(SUM(present), 0) as present FROM attendance_summary"
+    ).fetchone()
+    total_records = totals['total']
+    present_records = totals['present']
     avg_attendance = round((present_records / total_records * 100) if total_records > 0 else 0)
    
-    students_below_75 = db.execute("""
-        SELECT COUNT(DISTINCT student_id) as count
-        FROM (
-            SELECT student_id,
-                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as attendance_pct
-            FROM attendance
-            GROUP BY student_id
-            HAVING attendance_pct < 75
-        )
-    """).fetchone()['count']
-   
-    perfect_attendance = db.execute("""
-        SELECT COUNT(DISTINCT student_id) as count
-        FROM (
-            SELECT student_id,
-                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as attendance_pct
-            FROM attendance
-            GROUP BY student_id
-            HAVING attendance_pct = 100
-        )
-    """).fetchone()['count']
+    engine = get_analytics(db)
+    if engine is not None:
+        students_below_75, perfect_attendance = engine.report_counts()
+    else:
+        students_below_75 = db.execute("""
+            SELECT COUNT(DISTINCT student_id) as count
+            FROM (
+                SELECT student_id,
+                       SUM(present) * 100.0 / SUM(total) as attendance_pct
+                FROM attendance_summary
+                GROUP BY student_id
+                HAVING attendance_pct < 75
+            )
+        """).fetchone()['count']
+
+        perfect_attendance = db.execute("""
+            SELECT COUNT(DISTINCT student_id) as count
+            FROM (
+                SELECT student_id,
+                       SUM(present) * 100.0 / SUM(total) as attendance_pct
+                FROM attendance_summary
+                GROUP BY student_id
+                HAVING attendance_pct = 100
+            )
+        """).fetchone()['count']
    
     return render_template('admin_reports.html',
                          notices=notices,
+                         notices_page=notices_page,
+                         more_notices=more_notices,
                          total_classes=total_classes,
                          avg_attendance=avg_attendance,
                          below_75=students_below_75,
                          perfect_attendance=perfect_attendance)
 
+@app.route('/admin/defaulters')
+@admin_required
+def admin_defaulters():
+    # Students below ?threshold= (default DEFAULTER_THRESHOLD) per subject;
+    # ?class= and ?subject= narrow the list, ?format=csv downloads it
+    db = get_db()
+    class_filter = request.args.get('class', '').strip()
+    subject_filter = request.args.get('subject', '').strip()
+    threshold = parse_threshold(request.args.get('threshold'), DEFAULTER_THRESHOLD)
+    if threshold is None:
+        flash('Threshold must be a percentage between 0 and 100 with at most two decimals.', 'error')
+        threshold = parse_threshold(None, DEFAULTER_THRESHOLD)
+    defaulters = defaulter_lists.get(db, threshold, class_filter, subject_filter)
+
+    if request.args.get('format') == 'csv':
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Class', 'Subject', 'Roll Number', 'Full Name', 'Present', 'Total',
+                         'Attendance %', 'Lectures Needed'])
+        writer.writerows(
+            [d['class_name'] or 'N/A', d['subject'], d['roll_number'] or 'N/A', d['full_name'],
+             d['present'], d['total'], d['percentage'],
+             d['lectures_needed'] if d['lectures_needed'] is not None else 'N/A']
+            for d in defaulters
+        )
+        return Response(buffer.getvalue(), mimetype='text/csv', headers={
+            'Content-Disposition': f'attachment; filename=defaulters_{datetime.now().strftime("%Y%m%d")}.csv'
+        })
+
+    subjects = [row['name'] for row in db.execute('SELECT name FROM subjects ORDER BY name')]
+    return render_template('admin_defaulters.html',
+                         defaulters=defaulters,
+                         students=len({d['student_id'] for d in defaulters}),
+                         threshold=f'{float(threshold):g}',
+                         class_filter=class_filter,
+                         subject_filter=subject_filter,
+                         class_list=[row['class_name'] for row in get_classes(db)],
+                         subjects=subjects)
+
 @app.route('/admin/notice/create', methods=['POST'])
 @admin_required
 def create_notice():
@@ -576,7 +967,11 @@ def add_user():
         class_name = request.form.get('class_name', '')
         roll_number = request.form.get('roll_number', '')
        
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HashQueueFull:
+            flash('The server is busy. Please try again in a moment.', 'error')
+            return render_template('admin_add_user.html')
        
         db = get_db()
         try:
@@ -592,17 +987,102 @@ def add_user():
    
     return render_template('admin_add_user.html')
 
+@app.route('/admin/import', methods=['GET', 'POST'])
+@admin_required
+def admin_import():
+    if request.method == 'POST':
+        kind = request.form.get('kind')
+        upload = request.files.get('file')
+        if kind not in ('users', 'attendance') or not upload or not upload.filename:
+            flash('Choose what to import and a CSV file.', 'error')
+            return redirect(url_for('admin_import'))
+        db = get_db()
+        # The upload is parsed straight from its stream, batch by batch
+        if kind == 'users':
+            with ProcessPoolExecutor(max_workers=IMPORT_HASH_WORKERS) as executor:
+                report = importer.import_users(db, upload.stream, executor)
+        else:
+            report = importer.import_attendance(db, upload.stream)
+            attendance_changed(report.student_ids)
+        flash(f'Imported {report.imported} of {report.rows} {kind} rows.',
+              'success' if not report.error_count else 'error')
+        return render_template('admin_import.html', report=report.as_dict())
+    return render_template('admin_import.html', report=None)
+
 @app.route('/admin/user/delete/<int:user_id>', methods=['POST'])
 @admin_required
 def delete_user(user_id):
     db = get_db()
-    db.execute('DELETE FROM users WHERE id = ?', (user_id,))
+    # Attendance first: the daily-marks trigger looks up the student's class
     db.execute('DELETE FROM attendance WHERE student_id = ?', (user_id,))
+    db.execute('DELETE FROM users WHERE id = ?', (user_id,))
+    session_store.revoke_user(db, user_id)
     db.commit()
+    attendance_changed([user_id])
    
     flash('User deleted successfully!', 'success')
     return redirect(url_for('admin_users'))
 
+def format_timestamp(value):
+    return datetime.fromtimestamp(value).strftime('%Y-%m-%d %H:%M')
+
+@app.route('/admin/sessions')
+@admin_required
+def admin_sessions():
+    db = get_db()
+    user_id = request.args.get('user_id', type=int)
+    sessions = [dict(row, created_at=format_timestamp(row['created_at']),
+                     last_seen=format_timestamp(row['last_seen']),
+                     expires_at=format_timestamp(row['expires_at']))
+                for row in session_store.active(db, user_id)]
+    return render_template('admin_sessions.html', sessions=sessions, user_filter=user_id)
+
+@app.route('/admin/sessions/revoke/<int:session_id>', methods=['POST'])
+@admin_required
+def revoke_session(session_id):
+    db = get_db()
+    revoked = session_store.revoke(db, session_id)
+    db.commit()
+    flash('Session revoked.' if revoked else 'That session has already ended.', 'success' if revoked else 'error')
+    return redirect(request.referrer or url_for('admin_sessions'))
+
+@app.route('/admin/user/<int:user_id>/sessions/revoke', methods=['POST'])
+@admin_required
+def revoke_user_sessions(user_id):
+    db = get_db()
+    revoked = session_store.revoke_user(db, user_id)
+    db.commit()
+    flash(f"Signed the user out of {revoked} session{'' if revoked == 1 else 's'}.", 'success')
+    return redirect(request.referrer or url_for('admin_sessions'))
+
+@app.route('/admin/db/pool')
+@admin_required
+def admin_pool_stats():
+    return jsonify(get_pool().stats())
+
+@app.route('/admin/db/queries')
+@admin_required
+def admin_query_stats():
+    if request.args.get('reset'):
+        sql_stats.reset()
+    return jsonify(sql_stats.stats(top=request.args.get('top', 5, type=int)))
+
+@app.route('/admin/db/analytics')
+@admin_required
+def admin_analytics_stats():
+    if analytics is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **analytics.stats()})
+
+@app.route('/admin/auth/stats')
+@admin_required
+def admin_auth_stats():
+    return jsonify({
+        'hashing': password_hasher.stats(),
+        'ip_throttle': ip_throttle.stats(),
+        'account_throttle': account_throttle.stats(),
+    })
+
 @app.route('/admin/download/pdf')
 @admin_required
 def download_pdf():
@@ -611,76 +1091,44 @@ def download_pdf():
 
     base_query = """
         SELECT u.full_name, u.class_name, u.roll_number,
-               COUNT(a.id) as total,
-               SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as presents,
-               SUM(CASE WHEN a.status = 'Absent' THEN 1 ELSE 0 END) as absents
+               COALESCE(SUM(s.total), 0) as total,
+               COALESCE(SUM(s.present), 0) as presents,
+               COALESCE(SUM(s.absent), 0) as absents
         FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id
+        LEFT JOIN attendance_summary s ON u.id = s.student_id
         WHERE u.role = 'student'
     """
     params = []
     if class_filter:
         base_query += " AND u.class_name = ?"
         params.append(class_filter)
-    base_query += " GROUP BY u.id ORDER BY u.class_name, u.roll_number"
-    attendance_data = db.execute(base_query, params).fetchall()
-
-    html_content = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; padding: 20px; }}
-            h1 {{ color: #1e293b; text-align: center; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-            th {{ background: #3b82f6; color: white; padding: 10px; text-align: left; }}
-            td {{ padding: 8px; border-bottom: 1px solid #e5e7eb; }}
-            tr:hover {{ background: #f9fafb; }}
-        </style>
-    </head>
-    <body>
-        <h1>AttendEase - Attendance Report</h1>
-        <p>Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-        <table>
-            <thead>
-                <tr>
-                    <th>Roll No</th>
-                    <th>Name</th>
-                    <th>Class</th>
-                    <th>Present</th>
-                    <th>Absent</th>
-                    <th>Total</th>
-                    <th>Attendance %</th>
-                </tr>
-            </thead>
-            <tbody>
-    """
-    
-    for record in attendance_data:
-        percentage = round((record['presents'] / record['total'] * 100) if record['total'] > 0 else 0)
-        html_content += f"""
-                <tr>
-                    <td>{record['roll_number'] or 'N/A'}</td>
-                    <td>{record['full_name']}</td>
-                    <td>{record['class_name'] or 'N/A'}</td>
-                    <td>{record['presents']}</td>
-                    <td>{record['absents']}</td>
-                    <td>{record['total']}</td>
-                    <td>{percentage}%</td>
-                </tr>
-        """
-    
-    html_content += """
-            </tbody>
-        </table>
-    </body>
-    </html>
-    """
-    
-    response = make_response(html_content)
-    response.headers['Content-Type'] = 'text/html'
-    response.headers['Content-Disposition'] = f'attachment; filename=attendance_report_{datetime.now().strftime("%Y%m%d")}.html'
-    
-    return response
+    base_query += " GROUP BY u.class_name, u.roll_number, u.id ORDER BY u.class_name, u.roll_number, u.id"
+
+    def report_rows():
+        # The query runs inside the streamed body, which holds the connection
+        # until the response is closed (see streamed())
+        for rows in iter_chunks(db.execute(base_query, params)):
+            for record in rows:
+                yield {
+                    'roll_number': record['roll_number'],
+                    'full_name': record['full_name'],
+                    'class_name': record['class_name'],
+                    'presents': record['presents'],
+                    'absents': record['absents'],
+                    'total': record['total'],
+                    'percentage': round((record['presents'] / record['total'] * 100) if record['total'] > 0 else 0),
+                }
+
+    # Rows arrive ordered by class, so each class becomes one table section
+    # rendered while the next chunk is read from the cursor
+    groups = groupby(report_rows(), key=itemgetter('class_name'))
+    return streamed(
+        buffered(stream_template('attendance_report.html',
+                                 groups=groups,
+                                 generated_on=datetime.now().strftime('%B %d, %Y at %I:%M %p'))),
+        mimetype='text/html',
+        headers={'Content-Disposition': f'attachment; filename=attendance_report_{datetime.now().strftime("%Y%m%d")}.html'}
+    )
 
 
 @app.route('/admin/download/csv')
@@ -688,130 +1136,155 @@ def download_pdf():
 def download_csv():
     db = get_db()
     class_filter = request.args.get('class', '').strip()
-
-    base_query = """
-        SELECT u.roll_number, u.full_name, u.class_name,
-               COUNT(a.id) as total,
-               SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as presents,
-               SUM(CASE WHEN a.status = 'Absent' THEN 1 ELSE 0 END) as absents
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id
-        WHERE u.role = 'student'
-    """
+    detailed = request.args.get('detail') == 'records'
     params = []
-    if class_filter:
-        base_query += " AND u.class_name = ?"
-        params.append(class_filter)
-    base_query += " GROUP BY u.id ORDER BY u.class_name, u.roll_number"
-    attendance_data = db.execute(base_query, params).fetchall()
-
-    si = StringIO()
-    writer = csv.writer(si)
-    writer.writerow(['Roll Number', 'Full Name', 'Class', 'Present', 'Absent', 'Total', 'Attendance %'])
-
-    for record in attendance_data:
-        percentage = round((record['presents'] / record['total'] * 100) if record['total'] > 0 else 0)
-        writer.writerow([
-            record['roll_number'] or 'N/A',
-            record['full_name'],
-            record['class_name'] or 'N/A',
-            record['presents'],
-            record['absents'],
-            record['total'],
-            f"{percentage}%"
-        ])
-
-    output = si.getvalue()
-    si.close()
-    response = make_response(output)
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename=attendance_report_{datetime.now().strftime("%Y%m%d")}.csv'
-    return response
+
+    if detailed:
+        # One line per attendance record, streamed student by student
+        query = """
+            SELECT u.roll_number, u.full_name, u.class_name, a.date, a.subject_id, a.status_id
+            FROM users u
+            JOIN attendance a ON a.student_id = u.id
+            WHERE u.role = 'student'
+        """
+        if class_filter:
+            query += " AND u.class_name = ?"
+            params.append(class_filter)
+        query += " ORDER BY u.class_name, u.roll_number, u.id, a.date, a.subject_id"
+        header = ['Roll Number', 'Full Name', 'Class', 'Date', 'Subject', 'Status']
+        subjects, statuses = get_names(db)
+
+        def format_row(record):
+            return [record['roll_number'] or 'N/A', record['full_name'], record['class_name'] or 'N/A',
+                    record['date'], subjects.get(record['subject_id']), statuses.get(record['status_id'])]
+    else:
+        query = """
+            SELECT u.roll_number, u.full_name, u.class_name,
+                   COALESCE(SUM(s.total), 0) as total,
+                   COALESCE(SUM(s.present), 0) as presents,
+                   COALESCE(SUM(s.absent), 0) as absents
+            FROM users u
+            LEFT JOIN attendance_summary s ON u.id = s.student_id
+            WHERE u.role = 'student'
+        """
+        if class_filter:
+            query += " AND u.class_name = ?"
+            params.append(class_filter)
+        # Grouping in index order lets SQLite stream rows without a sort
+        query += " GROUP BY u.class_name, u.roll_number, u.id ORDER BY u.class_name, u.roll_number, u.id"
+        header = ['Roll Number', 'Full Name', 'Class', 'Present', 'Absent', 'Total', 'Attendance %']
+
+        def format_row(record):
+            percentage = round((record['presents'] / record['total'] * 100) if record['total'] > 0 else 0)
+            return [record['roll_number'] or 'N/A', record['full_name'], record['class_name'] or 'N/A',
+                    record['presents'], record['absents'], record['total'], f"{percentage}%"]
+
+    def generate():
+        # The query runs inside the streamed body, which holds the connection
+        # until the response is closed (see streamed())
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for rows in iter_chunks(db.execute(query, params)):
+            writer.writerows(format_row(record) for record in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    suffix = '_records' if detailed else ''
+    return streamed(generate(), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename=attendance_report{suffix}_{datetime.now().strftime("%Y%m%d")}.csv'
+    })
 
 
 # ============= FACULTY MODULE ROUTES =============
 
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+def valid_time(value):
+    # 'HH:MM' on a 24-hour clock, the form timetable.start_time/end_time use
+    try:
+        return len(value) == 5 and datetime.strptime(value, '%H:%M') is not None
+    except ValueError:
+        return False
+
+def slot_time(slot):
+    # '13:00'/'14:30' -> '1:00 - 2:30', the way the schedule has always been shown
+    def short(value):
+        hour, minute = value.split(':')
+        return f"{(int(hour) - 1) % 12 + 1}:{minute}"
+    return f"{short(slot['start_time'])} - {short(slot['end_time'])}"
+
 @app.route('/faculty/dashboard')
 @faculty_required
 def faculty_dashboard():
     from datetime import datetime, date
     db = get_db()
 
-    # Fetch faculty's assigned subject from users table
-    faculty = db.execute('SELECT subject, full_name FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-    faculty_subject = faculty['subject'] if faculty and faculty['subject'] else 'General'
-    faculty_name = faculty['full_name'] if faculty else "Faculty"
+    # Faculty's assigned subject, cached in the session at login
+    faculty_subject = session.get('user_subject') or 'General'
+    faculty_name = session.get('user_name', 'Faculty')
 
-    notices = db.execute('SELECT * FROM notices ORDER BY created_at DESC LIMIT 3').fetchall()
+    notices, _ = get_notices(db, 1, per_page=3)
 
     today_obj = date.today()
     today = today_obj.strftime('%Y-%m-%d')
-    today_day_name = today_obj.strftime('%A')
     current_time = datetime.now().time()
 
     # For dashboard cards
     total_students = db.execute("SELECT COUNT(*) as count FROM users WHERE role='student'").fetchone()['count']
 
-    # All valid classes for this subject
-    classes_with_subject = db.execute("""
-        SELECT DISTINCT u.class_name
-        FROM users u
-        JOIN attendance a ON u.id = a.student_id
-        WHERE u.role='student' AND a.subject=?
+    # The subject's weekly slots (one index range on timetable)
+    slots = db.execute("""
+        SELECT day_of_week, start_time, end_time, class_name
+        FROM timetable
+        WHERE subject = ?
+        ORDER BY day_of_week, start_time
     """, (faculty_subject,)).fetchall()
-    valid_classes = [r['class_name'] for r in classes_with_subject]
-
-    # Weekly schedule (use whichever format and classes you wish below)
-    all_schedules = [
-        {'day': 'Monday', 'time': '9:00 - 10:30', 'class': 'SE COMP-A'},
-        {'day': 'Monday', 'time': '11:00 - 12:30', 'class': 'SE COMP-B'},
-        {'day': 'Tuesday', 'time': '8:00 - 10:30', 'class': 'SE COMP-A'},
-        {'day': 'Wednesday', 'time': '2:00 - 3:30', 'class': 'SE COMP-B'},
-        {'day': 'Thursday', 'time': '10:00 - 11:30', 'class': 'SE COMP-A'},
-        {'day': 'Friday', 'time': '1:00 - 2:30', 'class': 'SE COMP-B'},
-    ]
-
-    # Only show schedule with classes which actually have this subject
     weekly_schedule = [
         {
-            'day_short': s['day'][:3],
-            'time': s['time'],
-            'class_name': s['class'],
+            'day_short': WEEKDAYS[s['day_of_week']][:3],
+            'time': slot_time(s),
+            'class_name': s['class_name'],
             'subject': faculty_subject,
-            'full_day': s['day']
+            'full_day': WEEKDAYS[s['day_of_week']]
         }
-        for s in all_schedules if s['class'] in valid_classes
+        for s in slots
     ]
 
-    # Today's schedule: Only those that match today's day
+    # Which of today's classes are already marked (one attendance_daily range)
+    marked = {
+        row['class_name']: row['marked']
+        for row in db.execute(
+            "SELECT class_name, marked FROM attendance_daily WHERE date = ? AND subject = ?",
+            (today, faculty_subject)
+        )
+    }
+
     todays_schedule = []
-    for schedule in weekly_schedule:
-        if schedule['full_day'] == today_day_name:
-            time_parts = schedule['time'].split(' - ')
-            start_time = datetime.strptime(time_parts[0].strip(), '%H:%M').time()
-            end_time = datetime.strptime(time_parts[1].strip(), '%H:%M').time()
-            attendance_marked = db.execute("""
-                SELECT COUNT(*) as count
-                FROM attendance a
-                JOIN users u ON a.student_id = u.id
-                WHERE u.class_name = ? AND a.date = ? AND a.subject = ?
-            """, (schedule['class_name'], today, faculty_subject)).fetchone()['count'] or 0
-
-            if attendance_marked > 0:
-                status = 'Completed'
-            elif current_time < start_time:
-                status = 'Upcoming'
-            elif current_time > end_time:
-                status = 'Pending'
-            else:
-                status = 'In Progress'
-
-            todays_schedule.append({
-                'time': schedule['time'],
-                'class_name': schedule['class_name'],
-                'subject': faculty_subject,
-                'status': status
-            })
+    for slot in slots:
+        if slot['day_of_week'] != today_obj.weekday():
+            continue
+        start_time = datetime.strptime(slot['start_time'], '%H:%M').time()
+        end_time = datetime.strptime(slot['end_time'], '%H:%M').time()
+
+        if marked.get(slot['class_name'], 0) > 0:
+            status = 'Completed'
+        elif current_time < start_time:
+            status = 'Upcoming'
+        elif current_time > end_time:
+            status = 'Pending'
+        else:
+            status = 'In Progress'
+
+        todays_schedule.append({
+            'time': slot_time(slot),
+            'class_name': slot['class_name'],
+            'subject': faculty_subject,
+            'status': status
+        })
 
     todays_classes = len(todays_schedule)
     attendance_pending = sum(1 for x in todays_schedule if x['status'] != 'Completed')
@@ -836,46 +1309,33 @@ def faculty_mark_attendance():
     db = get_db()
     
     # Get faculty's assigned subject
-    faculty = db.execute('SELECT subject FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-    faculty_subject = faculty['subject'] if faculty and faculty['subject'] else 'General'
+    faculty_subject = session.get('user_subject') or 'General'
     
     if request.method == 'POST':
         class_name = request.form.get('class_name')
-        attendance_date = request.form.get('date')
+        attendance_date = request.form.get('date', '')
         # SECURITY: Force subject to be faculty's assigned subject
         subject = faculty_subject
+        if parse_date(attendance_date) is None:
+            flash('Please choose a valid date (YYYY-MM-DD).', 'error')
+            return redirect(url_for('faculty_mark_attendance', **{'class': class_name}))
         
         # Get all students for the class
-        students = db.execute(
-            "SELECT id FROM users WHERE role='student' AND class_name=?",
-            (class_name,)
-        ).fetchall()
+        students = get_roster(db, class_name)
         
-        # Mark attendance
+        # Mark attendance for the whole class in one upsert
+        records = []
         for student in students:
             student_id = student['id']
             status = request.form.get(f'status_{student_id}', 'Absent')
-            
-            # Check if attendance already exists
-            existing = db.execute(
-                "SELECT id FROM attendance WHERE student_id=? AND date=? AND subject=?",
-                (student_id, attendance_date, subject)
-            ).fetchone()
-            
-            if not existing:
-                # Insert new attendance record
-                db.execute(
-                    "INSERT INTO attendance (student_id, date, subject, status) VALUES (?, ?, ?, ?)",
-                    (student_id, attendance_date, subject, status)
-                )
-            else:
-                # Update existing record
-                db.execute(
-                    "UPDATE attendance SET status = ? WHERE id = ?",
-                    (status, existing['id'])
-                )
-        
+            if status not in ATTENDANCE_STATUSES:
+                status = 'Absent'
+            records.append((student_id, attendance_date, subject, status))
+        upsert_attendance(db, records)
+        if students:
+            record_subject_assignments(db, subject, [class_name], session['user_id'])
         db.commit()
+        attendance_changed(student['id'] for student in students)
         flash(f'Attendance marked successfully for {class_name} - {subject}!', 'success')
         return redirect(url_for('faculty_mark_attendance'))
     
@@ -884,38 +1344,15 @@ def faculty_mark_attendance():
     selected_date = request.args.get('date', date.today().strftime('%Y-%m-%d'))
     
     # This ensures faculty can only mark classes where their subject is taught
-    classes = db.execute("""
-        SELECT DISTINCT u.class_name
-        FROM users u
-        JOIN attendance a ON u.id = a.student_id
-        WHERE u.role='student' 
-          AND u.class_name IS NOT NULL
-          AND a.subject = ?
-        ORDER BY u.class_name
-    """, (faculty_subject,)).fetchall()
-    
-    # If no classes found with attendance, show all classes but they won't have students
-    if not classes:
-        classes = db.execute("""
-            SELECT DISTINCT class_name
-            FROM users
-            WHERE role='student' AND class_name IS NOT NULL
-            ORDER BY class_name
-        """).fetchall()
+    # (every class while the subject has no assignments yet)
+    classes = get_classes(db, faculty_subject)
     
     # Set default class if none selected
     if not selected_class and classes:
         selected_class = classes[0]['class_name']
     
     # Get students for selected class
-    students = []
-    if selected_class:
-        students = db.execute("""
-            SELECT id, roll_number, full_name, class_name
-            FROM users
-            WHERE role='student' AND class_name=?
-            ORDER BY roll_number
-        """, (selected_class,)).fetchall()
+    students = get_roster(db, selected_class) if selected_class else []
     
     return render_template('faculty_mark_attendance.html',
                          students=students,
@@ -925,23 +1362,91 @@ def faculty_mark_attendance():
                          faculty_subject=faculty_subject)
 
 
+@app.route('/faculty/mark-attendance/bulk', methods=['POST'])
+@faculty_required
+def faculty_mark_attendance_bulk():
+    # JSON body: {"date": "YYYY-MM-DD", "class_name": "SE COMP-A" or [...] (optional),
+    #             "records": [{"student_id": 7, "status": "Present"}, ...]}
+    # Students of the listed classes missing from "records" are marked Absent,
+    # like the form. Everything is written in a single transaction.
+    db = get_db()
+    subject = session.get('user_subject') or 'General'
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'body must be a JSON object'}), 400
+    attendance_date = payload.get('date', '')
+    if parse_date(attendance_date) is None:
+        return jsonify({'error': 'date must be in YYYY-MM-DD format'}), 400
+
+    class_names = payload.get('class_name') or []
+    if isinstance(class_names, str):
+        class_names = [class_names]
+    if not isinstance(class_names, list) or not all(isinstance(name, str) for name in class_names):
+        return jsonify({'error': 'class_name must be a string or a list of strings'}), 400
+    records = payload.get('records') or []
+    if not isinstance(records, list):
+        return jsonify({'error': 'records must be a list'}), 400
+
+    statuses = {}
+    errors = []
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'error': 'record must be an object'})
+            continue
+        try:
+            student_id = int(record['student_id'])
+        except (TypeError, KeyError, ValueError):
+            errors.append({'index': index, 'error': 'invalid student_id'})
+            continue
+        status = record.get('status', 'Absent')
+        if status not in ATTENDANCE_STATUSES:
+            errors.append({'index': index, 'error': f'invalid status {status!r}'})
+            continue
+        statuses[student_id] = status
+
+    if class_names:
+        roster = [student for class_name in class_names for student in get_roster(db, class_name)]
+    else:
+        roster = []
+        ids = list(statuses)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            roster.extend(db.execute(
+                f"SELECT id, class_name FROM users WHERE role='student' AND id IN ({placeholders})", chunk
+            ))
+    valid_ids = {row['id'] for row in roster}
+
+    unknown = [student_id for student_id in statuses if student_id not in valid_ids]
+    errors.extend({'student_id': student_id, 'error': 'not a student in the given classes'} for student_id in unknown)
+    if errors:
+        return jsonify({'error': 'invalid records', 'details': errors}), 400
+
+    if class_names:
+        for student_id in valid_ids:
+            statuses.setdefault(student_id, 'Absent')
+
+    upsert_attendance(db, [(student_id, attendance_date, subject, status)
+                           for student_id, status in statuses.items()])
+    marked_classes = {row['class_name'] for row in roster if row['id'] in statuses}
+    record_subject_assignments(db, subject, marked_classes, session['user_id'])
+    db.commit()
+    attendance_changed(statuses)
+    return jsonify({'date': attendance_date, 'subject': subject, 'marked': len(statuses)})
+
+
 @app.route('/faculty/view-attendance')
 @faculty_required
 def faculty_view_attendance():
     db = get_db()
     
-    faculty = db.execute('SELECT subject FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-    faculty_subject = faculty['subject'] if faculty and faculty['subject'] else 'General'
+    faculty_subject = session.get('user_subject') or 'General'
     
     selected_class = request.args.get('class', None)
     
     # Get all classes
-    classes = db.execute("""
-        SELECT DISTINCT class_name
-        FROM users
-        WHERE role='student' AND class_name IS NOT NULL
-        ORDER BY class_name
-    """).fetchall()
+    classes = get_classes(db)
     
     if not selected_class and classes:
         selected_class = classes[0]['class_name']
@@ -950,30 +1455,45 @@ def faculty_view_attendance():
     # (Not number of days, but number of different classes like SE COMP-A, SE COMP-B)
     total_classes = db.execute("""
         SELECT COUNT(DISTINCT u.class_name) as count
-        FROM attendance a
-        JOIN users u ON a.student_id = u.id
-        WHERE a.subject = ?
+        FROM attendance_summary s
+        JOIN users u ON s.student_id = u.id
+        WHERE s.subject = ?
     """, (faculty_subject,)).fetchone()['count'] or 0
     
     # Get student-wise attendance FOR THIS SUBJECT ONLY
-    student_attendance = db.execute("""
-        SELECT 
-            u.roll_number,
-            u.full_name,
-            COUNT(a.id) as total_days,
-            SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) as present,
-            SUM(CASE WHEN a.status = 'Absent' THEN 1 ELSE 0 END) as absent,
-            CASE 
-                WHEN COUNT(a.id) > 0 
-                THEN ROUND(SUM(CASE WHEN a.status = 'Present' THEN 1 ELSE 0 END) * 100.0 / COUNT(a.id), 1)
-                ELSE 0
-            END as percentage
-        FROM users u
-        LEFT JOIN attendance a ON u.id = a.student_id AND a.subject = ?
-        WHERE u.role = 'student' AND u.class_name = ?
-        GROUP BY u.id
-        ORDER BY u.roll_number
-    """, (faculty_subject, selected_class)).fetchall()
+    engine = get_analytics(db)
+    if engine is not None:
+        roster = get_roster(db, selected_class) if selected_class else []
+        counts = engine.student_rows([s['id'] for s in roster], faculty_subject)
+        student_attendance = []
+        for student in roster:
+            present, absent, total = counts[student['id']]
+            student_attendance.append({
+                'roll_number': student['roll_number'],
+                'full_name': student['full_name'],
+                'total_days': total,
+                'present': present,
+                'absent': absent,
+                'percentage': round(present * 100.0 / total, 1) if total > 0 else 0,
+            })
+    else:
+        student_attendance = db.execute("""
+            SELECT 
+                u.roll_number,
+                u.full_name,
+                COALESCE(s.total, 0) as total_days,
+                COALESCE(s.present, 0) as present,
+                COALESCE(s.absent, 0) as absent,
+                CASE 
+                    WHEN s.total > 0 
+                    THEN ROUND(s.present * 100.0 / s.total, 1)
+                    ELSE 0
+                END as percentage
+            FROM users u
+            LEFT JOIN attendance_summary s ON u.id = s.student_id AND s.subject = ?
+            WHERE u.role = 'student' AND u.class_name = ?
+            ORDER BY u.roll_number
+        """, (faculty_subject, selected_class)).fetchall()
     
     # Calculate statistics
     avg_attendance = 0
@@ -1002,8 +1522,7 @@ def faculty_view_attendance():
 def faculty_send_notice():
     db = get_db()
     
-    faculty = db.execute('SELECT subject FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-    faculty_subject = faculty['subject'] if faculty and faculty['subject'] else 'General'
+    faculty_subject = session.get('user_subject') or 'General'
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -1023,5 +1542,152 @@ def faculty_send_notice():
     
     return render_template('faculty_send_notice.html', faculty_subject=faculty_subject)
 
+# ============= JSON API (v1) =============
+# Read-only JSON for dashboard widgets. Each response carries an ETag built
+# from the data_versions counters of the tables it reads, so a poll with a
+# matching If-None-Match is answered with 304 before any data is loaded.
+
+API_MAX_MONTHS = 36
+
+def api_error(status, message):
+    return jsonify({'error': message}), status
+
+def api_required(*roles):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'user_id' not in session:
+                return api_error(401, 'Authentication required.')
+            if roles and session.get('user_role') not in roles:
+                return api_error(403, 'Access denied.')
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def api_response(tables, load, key=''):
+    # `key` is anything else the body depends on besides the tables
+    db = get_db()
+    versions = data_version(db, *tables)
+    etag = hashlib.sha1(f'{request.full_path}|{versions}|{key}'.encode()).hexdigest()[:20]
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        body = load(db)
+        if body is None:
+            return api_error(404, 'Not found.')
+        response = jsonify(body)
+    response.set_etag(etag)
+    # Browsers revalidate on every poll instead of reusing a stale copy
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/v1/students/<int:student_id>/summary')
+@api_required()
+def api_student_summary(student_id):
+    if session.get('user_role') == 'student' and session['user_id'] != student_id:
+        return api_error(403, 'Students can only read their own summary.')
+
+    def load(db):
+        student = db.execute(
+            "SELECT id, full_name, class_name, roll_number FROM users WHERE id = ? AND role = 'student'",
+            (student_id,)
+        ).fetchone()
+        if student is None:
+            return None
+        return {'student': dict(student), **load_student_stats(db, student_id)}
+
+    return api_response(('users', 'attendance'), load)
+
+@app.route('/api/v1/classes/summary')
+@api_required('admin', 'faculty')
+def api_class_summary():
+    # Per class and subject totals; ?class= and ?subject= narrow the result
+    class_filter = request.args.get('class', '').strip()
+    subject_filter = request.args.get('subject', '').strip()
+
+    def load(db):
+        query = """
+            SELECT u.class_name, s.subject, COUNT(*) as students,
+                   SUM(s.present) as present, SUM(s.absent) as absent,
+                   SUM(s.leave) as leave, SUM(s.total) as total
+            FROM attendance_summary s
+            JOIN users u ON u.id = s.student_id
+            WHERE u.role = 'student' AND u.class_name IS NOT NULL
+        """
+        params = []
+        if class_filter:
+            query += " AND u.class_name = ?"
+            params.append(class_filter)
+        if subject_filter:
+            query += " AND s.subject = ?"
+            params.append(subject_filter)
+        query += " GROUP BY u.class_name, s.subject ORDER BY u.class_name, s.subject"
+        return {'classes': [
+            {**dict(row), 'percentage': round(row['present'] / row['total'] * 100, 1) if row['total'] else 0}
+            for row in db.execute(query, params)
+        ]}
+
+    return api_response(('users', 'attendance'), load)
+
+@app.route('/api/v1/defaulters')
+@api_required('admin', 'faculty')
+def api_defaulters():
+    # Students below ?threshold= per subject; ?class= and ?subject= narrow the list
+    class_filter = request.args.get('class', '').strip()
+    subject_filter = request.args.get('subject', '').strip()
+    threshold = parse_threshold(request.args.get('threshold'), DEFAULTER_THRESHOLD)
+    if threshold is None:
+        return api_error(400, 'threshold must be a percentage between 0 and 100 with at most two decimals.')
+
+    def load(db):
+        return {'threshold': float(threshold),
+                'defaulters': defaulter_lists.get(db, threshold, class_filter, subject_filter)}
+
+    return api_response(('users', 'attendance'), load)
+
+@app.route('/api/v1/trends/monthly')
+@api_required('admin', 'faculty')
+def api_monthly_trend():
+    # The last ?months= calendar months, oldest first, from the monthly rollup
+    months_back = max(1, min(API_MAX_MONTHS, request.args.get('months', 10, type=int)))
+    today = date.today()
+
+    def load(db):
+        months = []
+        year, month = today.year, today.month
+        for _ in range(months_back):
+            months.append(f'{year:04d}-{month:02d}')
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        months.reverse()
+        totals = {row['month']: row for row in db.execute(
+            "SELECT month, present, total FROM attendance_monthly WHERE month BETWEEN ? AND ?",
+            (months[0], months[-1])
+        )}
+        trend = []
+        for month in months:
+            row = totals.get(month)
+            present, total = (row['present'], row['total']) if row else (0, 0)
+            trend.append({
+                'month': month,
+                'label': datetime.strptime(month, '%Y-%m').strftime('%b'),
+                'present': present,
+                'total': total,
+                'percentage': round(present / total * 100) if total > 0 else 0,
+            })
+        return {'months': trend}
+
+    return api_response(('attendance',), load, key=today.strftime('%Y-%m'))
+
+@app.route('/api/v1/notices')
+@api_required()
+def api_notices():
+    page, per_page = max(request.args.get('page', 1, type=int), 1), NOTICES_PAGE_SIZE
+
+    def load(db):
+        notices, has_more = get_notices(db, page, per_page)
+        return {'notices': notices, 'page': page, 'has_more': has_more}
+
+    return api_response(('notices',), load)
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,118 @@
+"""Report aggregates: SQL over attendance_summary/attendance vs. NumPy columns.
+
+Generates a synthetic database with about --rows attendance records and
+times, for each path, the admin_reports counts (students below 75% and at
+100%) and the per-student totals behind admin_classes and
+faculty_view_attendance. For the columnar engine it also times the initial
+load, an incremental sync after --append new marks and the full reload
+forced by a re-mark.
+
+    python benchmarks/bench_analytics.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import STATUS_IDS, day_number, generate_dataset, upsert_attendance
+from analytics import ColumnarAnalytics, available
+
+SQL_REPORT = """
+    SELECT COALESCE(SUM(pct < 75), 0), COALESCE(SUM(pct = 100), 0)
+    FROM (SELECT SUM(present) * 100.0 / SUM(total) as pct FROM attendance_summary GROUP BY student_id)
+"""
+SQL_REPORT_RAW = f"""
+    SELECT COALESCE(SUM(pct < 75), 0), COALESCE(SUM(pct = 100), 0)
+    FROM (SELECT SUM(status_id = {STATUS_IDS['Present']}) * 100.0 / COUNT(*) as pct FROM attendance GROUP BY student_id)
+"""
+SQL_STUDENTS = """
+    SELECT u.id, COALESCE(SUM(s.present), 0), COALESCE(SUM(s.absent), 0), COALESCE(SUM(s.total), 0)
+    FROM users u LEFT JOIN attendance_summary s ON u.id = s.student_id
+    WHERE u.role = 'student' GROUP BY u.id
+"""
+SQL_CLASS_SUBJECT = """
+    SELECT u.id, COALESCE(s.present, 0), COALESCE(s.absent, 0), COALESCE(s.total, 0)
+    FROM users u LEFT JOIN attendance_summary s ON u.id = s.student_id AND s.subject = ?
+    WHERE u.role = 'student' AND u.class_name = ?
+"""
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--append', type=int, default=600, help='new marks for the incremental sync')
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args()
+    if not available():
+        sys.exit('NumPy is not installed; nothing to compare against')
+
+    students, lectures, subjects = 60, 3, 6
+    classes = max(1, min(100, args.rows // (students * lectures * 150)))
+    days = max(1, -(-args.rows // (classes * students * lectures)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'analytics.db')
+        generate_dataset(path, classes=classes, students=students, subjects=subjects,
+                         days=days, lectures=lectures, quiet=True)
+        conn = sqlite3.connect(path, isolation_level=None)
+        rows = conn.execute('SELECT COUNT(*) FROM attendance').fetchone()[0]
+        class_name, subject = 'Class 001', 'Subject 01'
+        roster = [r[0] for r in conn.execute(
+            "SELECT id FROM users WHERE role='student' AND class_name=?", (class_name,))]
+        all_students = [r[0] for r in conn.execute("SELECT id FROM users WHERE role='student'")]
+        print(f"{rows:,} attendance rows, {len(all_students):,} students\n")
+
+        engine = ColumnarAnalytics()
+        load_ms, _ = timed(lambda: engine.sync(conn), 1)
+        stats = engine.stats()
+        print(f"columnar load      {load_ms:>10.1f} ms  ({stats['bytes'] / 2 ** 20:.1f} MiB)")
+
+        results = [
+            ('report counts', lambda: tuple(conn.execute(SQL_REPORT).fetchone()),
+             lambda: engine.report_counts()),
+            ('report counts (raw)', lambda: tuple(conn.execute(SQL_REPORT_RAW).fetchone()),
+             lambda: engine.report_counts()),
+            ('all students', lambda: len(conn.execute(SQL_STUDENTS).fetchall()),
+             lambda: len(engine.student_rows(all_students))),
+            ('class + subject', lambda: len(conn.execute(SQL_CLASS_SUBJECT, (subject, class_name)).fetchall()),
+             lambda: len(engine.student_rows(roster, subject))),
+            ('last 30 days', lambda: conn.execute(
+                "SELECT COUNT(DISTINCT student_id) FROM attendance WHERE day >= ?",
+                (day_number(date.today() - timedelta(days=30)),)).fetchone()[0],
+             lambda: int((engine.totals(since=date.today() - timedelta(days=30))[3] > 0).sum())),
+        ]
+        print(f"\n{'aggregate':<22}{'SQL ms':>10}{'NumPy ms':>10}{'speedup':>9}  same")
+        for label, sql_fn, numpy_fn in results:
+            sql_ms, sql_result = timed(sql_fn, args.repeat)
+            numpy_ms, numpy_result = timed(numpy_fn, args.repeat)
+            print(f"{label:<22}{sql_ms:>10.2f}{numpy_ms:>10.2f}{sql_ms / numpy_ms:>8.1f}x  {sql_result == numpy_result}")
+
+        day = (date.today() + timedelta(days=1)).isoformat()
+        new_marks = [(student_id, day, subject, 'Present') for student_id in all_students[:args.append]]
+        upsert_attendance(conn, new_marks)
+        append_ms, _ = timed(lambda: engine.sync(conn), 1)
+        upsert_attendance(conn, [(s, d, sub, 'Absent') for s, d, sub, _ in new_marks[:10]])
+        reload_ms, _ = timed(lambda: engine.sync(conn), 1)
+        unchanged_ms, _ = timed(lambda: engine.sync(conn), args.repeat)
+        stats = engine.stats()
+        print(f"\nsync, unchanged    {unchanged_ms:>10.2f} ms")
+        print(f"sync, +{len(new_marks)} inserts {append_ms:>9.2f} ms  (appends={stats['appends']})")
+        print(f"sync, after remark {reload_ms:>10.2f} ms  (full loads={stats['full_loads']})")
+        print(f"report counts still match: {tuple(conn.execute(SQL_REPORT).fetchone()) == engine.report_counts()}")
+        conn.close()
+
+if __name__ == '__main__':
+    main()
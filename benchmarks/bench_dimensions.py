@@ -0,0 +1,145 @@
+"""Attendance size and scan speed with text vs. id subject/status columns.
+
+Builds a throwaway database with --rows synthetic attendance records at
+schema version 12 (subject and status stored as text in every row), measures
+the attendance table and its indexes and times a few scans, then applies
+migration 13 (ids into the subjects/statuses lookup tables) and repeats.
+
+    python benchmarks/bench_dimensions.py --rows 10000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import STATUS_IDS, migrate, SCHEMA_VERSION
+
+TEXT_SCHEMA = 12
+
+SUBJECTS = ['Data Structures', 'Object Oriented Programming', 'Discrete Mathematics',
+            'Digital Logic Design', 'Computer Graphics', 'Database Management Systems',
+            'Operating Systems', 'Computer Networks']
+
+# Column spellings before and after migration 13
+TEXT_COLUMNS = {'subject': 'subject', 'status': 'status', 'present': "status = 'Present'"}
+ID_COLUMNS = {'subject': 'subject_id', 'status': 'status_id', 'present': f"status_id = {STATUS_IDS['Present']}"}
+
+SCANS = {
+    # Every row, every column (the detailed CSV export)
+    'read all rows': "SELECT student_id, date, {subject}, {status} FROM attendance",
+    # Table scan with a status test per row (raw report percentages)
+    'present per subject': "SELECT {subject}, SUM({present}) FROM attendance GROUP BY {subject}",
+    # Index-only scan of (subject, day)
+    'rows per subject': "SELECT {subject}, COUNT(*) FROM attendance GROUP BY {subject}",
+    # Index range plus row lookups (one student's history)
+    'student history': "SELECT date, {subject}, {status} FROM attendance WHERE student_id = ?",
+}
+
+def build(path, rows, students):
+    # Load at version 1 (no indexes or triggers), then migrate to the last
+    # text-column schema so indexes and summaries are built once
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    migrate(conn, target=1)
+    conn.executemany(
+        "INSERT INTO users (full_name, email, password, role, class_name) VALUES (?, ?, 'x', 'student', ?)",
+        ((f'Student {i}', f's{i}@bench.edu', f'CLASS-{i % 20}') for i in range(students))
+    )
+    lectures = 3
+    days = -(-rows // (students * lectures))
+    start = date.today() - timedelta(days=days)
+    rng = random.Random(42)
+
+    def records():
+        produced = 0
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            todays = rng.sample(SUBJECTS, lectures)
+            for student_id in range(1, students + 1):
+                for subject in todays:
+                    if produced == rows:
+                        return
+                    produced += 1
+                    roll = rng.random()
+                    yield (student_id, day, subject, 'Present' if roll < 0.8 else ('Leave' if roll > 0.98 else 'Absent'))
+
+    conn.executemany("INSERT INTO attendance (student_id, date, subject, status) VALUES (?, ?, ?, ?)", records())
+    conn.commit()
+    migrate(conn, target=TEXT_SCHEMA)
+    return conn
+
+def sizes(conn):
+    # Bytes in the attendance table and in its indexes
+    try:
+        rows = conn.execute('''
+            SELECT m.type, SUM(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name
+            WHERE m.tbl_name = 'attendance' GROUP BY m.type
+        ''').fetchall()
+    except sqlite3.OperationalError:
+        return None  # SQLite built without the dbstat table
+    by_type = dict(rows)
+    return by_type.get('table', 0), by_type.get('index', 0)
+
+def run(conn, columns, students, repeat):
+    results = {}
+    for name, sql in SCANS.items():
+        sql = sql.format(**columns)
+        timings = []
+        for _ in range(repeat):
+            params = (random.randint(1, students),) if '?' in sql else ()
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+def mib(value):
+    return f'{value / 2**20:,.1f}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--students', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        conn = build(os.path.join(tmp, 'bench.db'), args.rows, args.students)
+        print(f"Built {args.rows:,} attendance rows at schema version {TEXT_SCHEMA} "
+              f"in {time.perf_counter() - started:.1f}s")
+        size_before = sizes(conn)
+        before = run(conn, TEXT_COLUMNS, args.students, args.repeat)
+
+        started = time.perf_counter()
+        migrate(conn)
+        print(f"Migrated to schema version {SCHEMA_VERSION} in {time.perf_counter() - started:.1f}s\n")
+        size_after = sizes(conn)
+        after = run(conn, ID_COLUMNS, args.students, args.repeat)
+        conn.close()
+
+    if size_before and size_after:
+        print(f"{'size':<22}{'text (MiB)':>14}{'ids (MiB)':>14}{'saved':>8}")
+        for label, old, new in (('attendance table', size_before[0], size_after[0]),
+                                ('attendance indexes', size_before[1], size_after[1])):
+            print(f"{label:<22}{mib(old):>14}{mib(new):>14}{1 - new / old:>8.0%}")
+        print()
+    else:
+        print("(this SQLite has no dbstat table; sizes skipped)\n")
+
+    print(f"{'scan':<22}{'text (ms)':>14}{'ids (ms)':>14}{'speedup':>9}")
+    for name in SCANS:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<22}{before[name]:>14.1f}{after[name]:>14.1f}{speedup:>8.2f}x")
+
+if __name__ == '__main__':
+    main()
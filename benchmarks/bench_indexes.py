@@ -0,0 +1,120 @@
+"""Compare the dashboard queries before and after the attendance indexes.
+
+Builds a throwaway database with --rows synthetic attendance records, times
+the queries at schema version 1 (no indexes), applies the remaining
+migrations and times them again. The queries are written the way the
+current schema needs them (day numbers, subject and status ids); at version
+1 the same conditions are spelled out against the text columns.
+
+    python benchmarks/bench_indexes.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DAY_EXPR, STATUS_IDS, day_number, migrate, SCHEMA_VERSION
+
+SUBJECTS = ['Data Structures', 'Object Oriented Programming', 'Discrete Mathematics',
+            'Digital Logic Design', 'Computer Graphics']
+
+# Column spellings at schema version 1 and now
+TEXT_COLUMNS = {'day': DAY_EXPR, 'subject': 'subject', 'status': 'status',
+                'subject_is': 'subject = ?', 'present': "status = 'Present'"}
+ID_COLUMNS = {'day': 'day', 'subject': 'subject_id', 'status': 'status_id',
+              'subject_is': 'subject_id = (SELECT id FROM subjects WHERE name = ?)',
+              'present': f"status_id = {STATUS_IDS['Present']}"}
+
+QUERIES = {
+    'student_dashboard': (
+        "SELECT {status}, {subject} FROM attendance WHERE student_id = ?",
+        lambda s, d: (s,)),
+    'attendance_history': (
+        "SELECT id, date, {subject}, {status} FROM attendance WHERE student_id = ? AND {day} >= ? "
+        "ORDER BY {day} DESC, id DESC",
+        lambda s, d: (s, day_number(d))),
+    'duplicate_check': (
+        "SELECT id FROM attendance WHERE student_id=? AND date=? AND {subject_is}",
+        lambda s, d: (s, d, SUBJECTS[0])),
+    'subject_day': (
+        "SELECT COUNT(*) FROM attendance WHERE {subject_is} AND {day} = ?",
+        lambda s, d: (SUBJECTS[1], day_number(d))),
+    'day_status': (
+        "SELECT COUNT(*) FROM attendance WHERE {day} = ? AND {present}",
+        lambda s, d: (day_number(d),)),
+}
+
+def build(path, rows, students):
+    conn = sqlite3.connect(path)
+    migrate(conn, target=1)
+    conn.executemany(
+        "INSERT INTO users (full_name, email, password, role, class_name) VALUES (?, ?, 'x', 'student', ?)",
+        ((f'Student {i}', f's{i}@bench.edu', f'CLASS-{i % 20}') for i in range(students))
+    )
+    per_day = students * len(SUBJECTS)
+    days = -(-rows // per_day)
+    start = date.today() - timedelta(days=days)
+
+    def records():
+        produced = 0
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            for student_id in range(1, students + 1):
+                for subject in SUBJECTS:
+                    if produced == rows:
+                        return
+                    produced += 1
+                    yield (student_id, day, subject, 'Present' if random.random() < 0.8 else 'Absent')
+
+    conn.executemany("INSERT INTO attendance (student_id, date, subject, status) VALUES (?, ?, ?, ?)", records())
+    conn.commit()
+    return conn, start, days
+
+def run(conn, students, start, days, repeat, columns):
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        sql = sql.format(**columns)
+        timings = []
+        for _ in range(repeat):
+            student_id = random.randint(1, students)
+            day = (start + timedelta(days=random.randrange(days))).isoformat()
+            t0 = time.perf_counter()
+            conn.execute(sql, params(student_id, day)).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        conn, start, days = build(os.path.join(tmp, 'bench.db'), args.rows, args.students)
+        print(f"Seeded {args.rows:,} attendance rows in {time.perf_counter() - t0:.1f}s")
+
+        before = run(conn, args.students, start, days, args.repeat, TEXT_COLUMNS)
+        t0 = time.perf_counter()
+        migrate(conn)
+        print(f"Migrated to schema version {SCHEMA_VERSION} in {time.perf_counter() - t0:.1f}s\n")
+        after = run(conn, args.students, start, days, args.repeat, ID_COLUMNS)
+        conn.close()
+
+    print(f"{'query':<22}{'no index (ms)':>16}{'indexed (ms)':>16}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"{name:<22}{before[name]:>16.3f}{after[name]:>16.3f}{speedup:>9.0f}x")
+
+if __name__ == '__main__':
+    main()
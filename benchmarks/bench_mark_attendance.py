@@ -0,0 +1,103 @@
+"""Compare the old per-student marking loop with the bulk upsert.
+
+Marks --classes classes of --students students each for one lecture, first
+as new marks and then as a re-mark with some statuses changed, and reports
+wall time and the number of statements each path sends to SQLite (an
+executemany call counts as one).
+
+    python benchmarks/bench_mark_attendance.py --classes 20 --students 120
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import migrate, upsert_attendance
+
+SUBJECT = 'Data Structures'
+
+def loop_path(conn, records):
+    # The previous faculty_mark_attendance implementation
+    # (with the subject and status looked up by name, as the schema now needs)
+    for student_id, day, subject, status in records:
+        conn.execute("INSERT OR IGNORE INTO subjects (name) VALUES (?)", (subject,))
+        existing = conn.execute(
+            "SELECT id FROM attendance WHERE student_id=? AND date=? "
+            "AND subject_id=(SELECT id FROM subjects WHERE name=?)",
+            (student_id, day, subject)
+        ).fetchone()
+        if not existing:
+            conn.execute(
+                "INSERT INTO attendance (student_id, date, subject_id, status_id) "
+                "VALUES (?, ?, (SELECT id FROM subjects WHERE name=?), (SELECT id FROM statuses WHERE name=?))",
+                (student_id, day, subject, status)
+            )
+        else:
+            conn.execute("UPDATE attendance SET status_id = (SELECT id FROM statuses WHERE name=?) WHERE id = ?",
+                         (status, existing[0]))
+    conn.commit()
+
+def bulk_path(conn, records):
+    upsert_attendance(conn, records)
+    conn.commit()
+
+class CountingConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = 0
+
+    def execute(self, *args):
+        self.statements += 1
+        return self.conn.execute(*args)
+
+    def executemany(self, *args):
+        self.statements += 1
+        return self.conn.executemany(*args)
+
+    def commit(self):
+        self.conn.commit()
+
+def build(path, classes, students):
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.executemany(
+        "INSERT INTO users (full_name, email, password, role, class_name) VALUES (?, ?, 'x', 'student', ?)",
+        ((f'Student {i}', f's{i}@bench.edu', f'CLASS-{i // students}') for i in range(classes * students))
+    )
+    conn.commit()
+    return conn
+
+def measure(conn, fn, classes, students, day, seed):
+    rng = random.Random(seed)
+    counting = CountingConnection(conn)
+    t0 = time.perf_counter()
+    for class_index in range(classes):
+        first = class_index * students + 1
+        records = [(student_id, day, SUBJECT, 'Present' if rng.random() < 0.8 else 'Absent')
+                   for student_id in range(first, first + students)]
+        fn(counting, records)
+    elapsed = (time.perf_counter() - t0) * 1000
+    return elapsed, counting.statements
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=20)
+    parser.add_argument('--students', type=int, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'path':<8}{'pass':<10}{'time (ms)':>12}{'statements':>12}")
+        for name, fn in (('loop', loop_path), ('bulk', bulk_path)):
+            conn = build(os.path.join(tmp, f'{name}.db'), args.classes, args.students)
+            for label, seed in (('first', 1), ('re-mark', 2)):
+                elapsed, executed = measure(conn, fn, args.classes, args.students, '2025-11-03', seed)
+                print(f"{name:<8}{label:<10}{elapsed:>12.1f}{executed:>12}")
+            conn.close()
+
+if __name__ == '__main__':
+    main()
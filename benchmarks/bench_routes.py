@@ -0,0 +1,269 @@
+"""Latency and query counts for every page, at several database sizes.
+
+For each --sizes entry, builds (or reuses, with --data-dir) a synthetic
+database of roughly that many attendance rows with `database.py generate`,
+then requests every GET route except /logout through the Flask test client
+with an admin, a faculty and a student session. Each route reports the
+first (cold cache) request, p50/p95 over --iterations warm requests and the
+number of SQL statements a request runs.
+
+    python benchmarks/bench_routes.py --sizes 1k,100k --output routes.json
+    python benchmarks/bench_routes.py --sizes 100k --compare routes.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app as attendease
+import database
+import sessions
+
+STUDENTS_PER_CLASS = 60
+SUBJECTS = 6
+LECTURES = 3
+MAX_CLASSES = 100
+CLASS = 'Class 001'
+SUBJECT = 'Subject 01'
+
+# (role, label, url); exports are slow at large sizes and run fewer times.
+# {student_id} is the id of the student the benchmark logs in as.
+ROUTES = [
+    (None, 'index', '/'),
+    (None, 'auth', '/auth'),
+    ('student', 'student_dashboard', '/dashboard'),
+    ('student', 'profile', '/profile'),
+    ('student', 'attendance_history', '/attendance_history'),
+    ('student', 'attendance_history_records', '/attendance_history/records'),
+    ('admin', 'admin_dashboard', '/admin/dashboard'),
+    ('admin', 'admin_users', '/admin/users'),
+    ('admin', 'admin_users_filter', f'/admin/users/filter?role=student&class={CLASS}'),
+    ('admin', 'admin_classes', '/admin/classes'),
+    ('admin', 'admin_classes_filter', f'/admin/classes/filter?class={CLASS}'),
+    ('admin', 'admin_class_detail', f'/admin/class/{CLASS}/{SUBJECT}'),
+    ('admin', 'admin_add_class', '/admin/class/add'),
+    ('admin', 'admin_add_user', '/admin/user/add'),
+    ('admin', 'admin_reports', '/admin/reports'),
+    ('admin', 'admin_defaulters', '/admin/defaulters'),
+    ('admin', 'admin_defaulters_csv', '/admin/defaulters?format=csv'),
+    ('admin', 'admin_import', '/admin/import'),
+    ('admin', 'admin_sessions', '/admin/sessions'),
+    ('admin', 'admin_db_pool', '/admin/db/pool'),
+    ('admin', 'admin_db_queries', '/admin/db/queries'),
+    ('admin', 'admin_db_analytics', '/admin/db/analytics'),
+    ('admin', 'admin_auth_stats', '/admin/auth/stats'),
+    ('admin', 'download_pdf', '/admin/download/pdf'),
+    ('admin', 'download_csv', '/admin/download/csv'),
+    ('admin', 'download_csv_records', '/admin/download/csv?detail=records'),
+    ('faculty', 'faculty_dashboard', '/faculty/dashboard'),
+    ('faculty', 'faculty_mark_attendance', f'/faculty/mark-attendance?class={CLASS}'),
+    ('faculty', 'faculty_view_attendance', f'/faculty/view-attendance?class={CLASS}'),
+    ('faculty', 'faculty_send_notice', '/faculty/send-notice'),
+    ('student', 'api_student_summary', '/api/v1/students/{student_id}/summary'),
+    ('faculty', 'api_class_summary', f'/api/v1/classes/summary?class={CLASS}'),
+    ('admin', 'api_defaulters', '/api/v1/defaulters'),
+    ('admin', 'api_monthly_trend', '/api/v1/trends/monthly'),
+    ('student', 'api_notices', '/api/v1/notices'),
+]
+EXPORTS = {'download_pdf', 'download_csv', 'download_csv_records'}
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {'k': 10 ** 3, 'm': 10 ** 6}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+def dataset_shape(rows):
+    # Grow the number of classes first, then the number of days
+    per_class_day = STUDENTS_PER_CLASS * LECTURES
+    classes = max(1, min(MAX_CLASSES, rows // (per_class_day * 150)))
+    days = max(1, math.ceil(rows / (classes * per_class_day)))
+    return classes, days
+
+def build_database(path, rows, seed):
+    if os.path.exists(path):
+        return
+    classes, days = dataset_shape(rows)
+    print(f"generating {path} ({classes} classes x {days} days)")
+    database.generate_dataset(path, classes=classes, students=STUDENTS_PER_CLASS, subjects=SUBJECTS,
+                              days=days, lectures=LECTURES, seed=seed, quiet=True)
+
+def sessions_for(path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    users = {
+        'admin': conn.execute("SELECT * FROM users WHERE role='admin' ORDER BY id LIMIT 1").fetchone(),
+        'faculty': conn.execute("SELECT * FROM users WHERE role='faculty' AND subject=? LIMIT 1",
+                                (SUBJECT,)).fetchone(),
+        'student': conn.execute("SELECT * FROM users WHERE role='student' AND class_name=? ORDER BY id LIMIT 1",
+                                (CLASS,)).fetchone(),
+    }
+    rows = conn.execute('SELECT COUNT(*) FROM attendance').fetchone()[0]
+    conn.close()
+    return users, rows
+
+class StatementCounter:
+    # Counts statements run on request connections from the benchmark thread
+    # only, so the KPI refresher's queries are not attributed to a route
+    def __init__(self):
+        self.count = 0
+        self.thread = threading.get_ident()
+        self.get_db = attendease.get_db
+
+    def _trace(self, statement):
+        if threading.get_ident() == self.thread:
+            self.count += 1
+
+    def install(self):
+        original = self.get_db
+
+        def counting_get_db():
+            db = original()
+            db.set_trace_callback(self._trace)
+            return db
+
+        attendease.get_db = counting_get_db
+
+    def uninstall(self):
+        attendease.get_db = self.get_db
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def bench_size(path, iterations, export_iterations, selected):
+    users, rows = sessions_for(path)
+    database.DATABASE = attendease.DATABASE = path
+    clients = {}
+    for role in (None, 'admin', 'faculty', 'student'):
+        client = attendease.app.test_client()
+        if role:
+            with client.session_transaction() as sess:
+                sess.update(sessions.profile(users[role]))
+        clients[role] = client
+    # Start every size from empty in-process caches
+    for cache in (attendease.faculty_cache, attendease.student_stats_cache, attendease.notices_cache):
+        cache.invalidate()
+    attendease.kpi_snapshots._snapshot = None
+
+    counter = StatementCounter()
+    counter.install()
+    results = {}
+    try:
+        for role, label, url in ROUTES:
+            if selected and label not in selected:
+                continue
+            url = url.format(student_id=users['student']['id'])
+            runs = export_iterations if label in EXPORTS else iterations
+            timings, statements = [], []
+            size = status = 0
+            for _ in range(runs + 1):
+                counter.count = 0
+                t0 = time.perf_counter()
+                # Closing the response ends a streamed request and returns its
+                # pooled connection (see streamed())
+                with clients[role].get(url) as response:
+                    body = response.get_data()
+                timings.append((time.perf_counter() - t0) * 1000)
+                statements.append(counter.count)
+                status, size = response.status_code, len(body)
+            cold, warm = timings[0], timings[1:] or timings
+            results[label] = {
+                'url': url,
+                'status': status,
+                'bytes': size,
+                'cold_ms': round(cold, 2),
+                'p50_ms': round(statistics.median(warm), 2),
+                'p95_ms': round(percentile(warm, 95), 2),
+                'cold_queries': statements[0],
+                'queries': int(statistics.median(statements[1:] or statements)),
+            }
+            r = results[label]
+            print(f"  {label:<28}{r['status']:>5}{r['cold_ms']:>11.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                  f"{r['cold_queries']:>8}{r['queries']:>8}{r['bytes']:>12,}")
+    finally:
+        counter.uninstall()
+    return rows, results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(report, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nChange in p50 vs {baseline_path} ({baseline['meta'].get('revision')})")
+    for size, current in report['sizes'].items():
+        previous = baseline['sizes'].get(size)
+        if not previous:
+            continue
+        print(f"  {size}")
+        for label, r in current['routes'].items():
+            old = previous['routes'].get(label)
+            if not old:
+                continue
+            change = (r['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0
+            print(f"    {label:<28}{old['p50_ms']:>10.1f}{r['p50_ms']:>10.1f}{change:>+9.0f}%"
+                  f"{old['queries']:>6} -> {r['queries']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k,10M', help='attendance rows per database, comma separated')
+    parser.add_argument('--iterations', type=int, default=20, help='warm requests per route')
+    parser.add_argument('--export-iterations', type=int, default=3, help='warm requests per download route')
+    parser.add_argument('--routes', default='', help='only these route labels, comma separated')
+    parser.add_argument('--data-dir', help='keep generated databases here and reuse them between runs')
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', help='JSON from an earlier run to compare against')
+    args = parser.parse_args()
+    selected = {label.strip() for label in args.routes.split(',') if label.strip()}
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'iterations': args.iterations,
+            'export_iterations': args.export_iterations,
+        },
+        'sizes': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for size in args.sizes.split(','):
+            target = parse_size(size)
+            path = os.path.join(data_dir, f'routes-{target}-{args.seed}.db')
+            build_database(path, target, args.seed)
+            print(f"\n{size.strip()} ({path})")
+            print(f"  {'route':<28}{'code':>5}{'cold ms':>11}{'p50 ms':>10}{'p95 ms':>10}"
+                  f"{'cold q':>8}{'q':>8}{'bytes':>12}")
+            rows, results = bench_size(path, args.iterations, args.export_iterations, selected)
+            report['sizes'][size.strip()] = {'attendance_rows': rows, 'routes': results}
+        attendease.get_pool().close_all()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nwrote {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == '__main__':
+    main()
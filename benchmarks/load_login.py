@@ -0,0 +1,105 @@
+"""Login throughput under concurrency, inline hashing vs. the hashing pool.
+
+Starts the app on a threaded local server against a freshly seeded
+database, fires --clients concurrent login loops for --seconds, and reports
+logins/second, login latency and the latency of a cheap page (/auth)
+requested alongside the logins.
+
+    python benchmarks/load_login.py --clients 16 --seconds 10
+"""
+import argparse
+import http.client
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+
+import app as attendease
+import database
+from hashing import PasswordHasher
+
+ACCOUNTS = [
+    ('aditya.patil@student.edu', 'Aditya@2201'),
+    ('priyanka.deshmukh@student.edu', 'Priyanka@2202'),
+    ('rahul.kulkarni@student.edu', 'Rahul@2203'),
+    ('sneha.joshi@student.edu', 'Sneha@2204'),
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def run(port, clients, seconds):
+    stop = time.monotonic() + seconds
+    logins, probes, errors = [], [], []
+
+    def login_loop(index):
+        email, password = ACCOUNTS[index % len(ACCOUNTS)]
+        body = urlencode({'email': email, 'password': password})
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            conn.request('POST', '/login', body, {'Content-Type': 'application/x-www-form-urlencoded'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 302 or 'auth' in response.getheader('Location', ''):
+                errors.append(response.status)
+            logins.append((time.perf_counter() - t0) * 1000)
+
+    def probe_loop():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            conn.request('GET', '/auth')
+            conn.getresponse().read()
+            probes.append((time.perf_counter() - t0) * 1000)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(clients)]
+    threads.append(threading.Thread(target=probe_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return logins, probes, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='hashing processes for the pooled run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE = attendease.DATABASE = os.path.join(tmp, 'database.db')
+        database.init_db()
+        # Every request comes from 127.0.0.1; lift the limits for the test
+        attendease.ip_throttle.limit = attendease.account_throttle.limit = 10 ** 9
+
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server = make_server('127.0.0.1', 0, attendease.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        print(f"{'hashing':<14}{'logins/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'/auth p95 ms':>14}{'errors':>8}")
+        for label, workers in (('inline', 0), (f'pool x{args.workers}', args.workers)):
+            attendease.password_hasher.shutdown()
+            attendease.password_hasher = PasswordHasher(workers=workers, max_pending=args.clients * 2)
+            logins, probes, errors = run(server.server_port, args.clients, args.seconds)
+            print(f"{label:<14}{len(logins) / args.seconds:>10.1f}{statistics.median(logins):>10.1f}"
+                  f"{percentile(logins, 95):>10.1f}{percentile(probes, 95):>14.1f}{len(errors):>8}")
+        attendease.password_hasher.shutdown()
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
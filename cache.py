@@ -0,0 +1,43 @@
+import threading
+import time
+
+# --- In-process Caches ---
+# Each value is stored with the data version it was built from. A lookup
+# with a different version, or after the optional TTL, reloads the value, so
+# callers only need a cheap version read (see data_versions) per request.
+
+class VersionedCache:
+    def __init__(self, ttl=None, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and (self.ttl is None or now - entry[1] < self.ttl):
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        value = loader()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (version, now, value)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
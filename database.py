@@ -1,17 +1,49 @@
 import sqlite3
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from werkzeug.security import generate_password_hash
 from datetime import date, timedelta
 import random
+import re
 
-def init_db():
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+DATABASE = 'database.db'
+ATTENDANCE_STATUSES = ('Present', 'Absent', 'Leave')
+# statuses.id for each status (fixed; the summary triggers rely on them)
+STATUS_IDS = {status: number for number, status in enumerate(ATTENDANCE_STATUSES, 1)}
+
+# attendance.day: the date as whole days since 1970-01-01
+DAY_EXPR = "CAST(julianday(date) - 2440587.5 AS INTEGER)"
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
 
-    # Drop existing tables on every initialization
-    cursor.execute('DROP TABLE IF EXISTS attendance')
-    cursor.execute('DROP TABLE IF EXISTS notices')
-    cursor.execute('DROP TABLE IF EXISTS users')
+def parse_date(value):
+    # Exactly 'YYYY-MM-DD' -> date, else None. Stored dates must be in this
+    # form: the day column and the monthly rollup read them as text.
+    if not isinstance(value, str) or not ISO_DATE.fullmatch(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
 
+def day_number(value):
+    # 'YYYY-MM-DD' (or a date) -> attendance.day; None when it is not a date
+    if isinstance(value, str):
+        value = parse_date(value)
+    try:
+        return value.toordinal() - EPOCH_ORDINAL
+    except AttributeError:
+        return None
+
+# --- Schema Migrations ---
+# Each migration moves the schema up by one version. The applied version is
+# kept in PRAGMA user_version so existing databases are upgraded in place.
+
+def _migration_1(cursor):
     # Users Table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -52,10 +84,890 @@ def init_db():
         )
     ''')
 
+def _migration_2(cursor):
+    # Older databases may hold repeated marks for the same lecture; keep the latest one
+    cursor.execute('''
+        DELETE FROM attendance
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM attendance GROUP BY student_id, date, subject
+        )
+    ''')
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_date_subject "
+        "ON attendance (student_id, date, subject)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_subject_date ON attendance (subject, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_date_status ON attendance (date, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role_class ON users (role, class_name)")
+
+def _migration_3(cursor):
+    # Per-student, per-subject counters so reports never have to scan attendance
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_summary (
+            student_id INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            present INTEGER NOT NULL DEFAULT 0,
+            absent INTEGER NOT NULL DEFAULT 0,
+            leave INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, subject)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_summary_subject ON attendance_summary (subject)")
+    for sql in TEXT_SUMMARY_TRIGGERS.values():
+        cursor.execute(sql)
+    _rebuild_text_summary(cursor)
+
+def _migration_4(cursor):
+    # Present/total per calendar month ('YYYY-MM') for the admin trend chart
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_monthly (
+            month TEXT PRIMARY KEY,
+            present INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for sql in TEXT_MONTHLY_TRIGGERS.values():
+        cursor.execute(sql)
+    _rebuild_text_monthly(cursor)
+
+def _migration_5(cursor):
+    # Rosters and exports walk students in (class, roll number) order; with
+    # this index they stream straight from the index without a sort step
+    cursor.execute("DROP INDEX IF EXISTS idx_users_role_class")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role_class_roll ON users (role, class_name, roll_number)")
+
+def _migration_6(cursor):
+    # Write counters per table; caches compare them to know when to reload
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    create_version_triggers(cursor, 'users')
+
+    # Which faculty member teaches a subject to a class
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subject_assignments (
+            subject TEXT NOT NULL,
+            class_name TEXT NOT NULL,
+            faculty_id INTEGER,
+            PRIMARY KEY (subject, class_name),
+            FOREIGN KEY (faculty_id) REFERENCES users(id)
+        ) WITHOUT ROWID
+    ''')
+    create_version_triggers(cursor, 'subject_assignments')
+    backfill_subject_assignments(cursor)
+
+def _migration_7(cursor):
+    # (student_id, date) plus the implicit rowid gives attendance history its
+    # (date, id) keyset order straight from the index
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance (student_id, date)")
+
+def _migration_8(cursor):
+    # Notices are always listed newest first; cached pages follow data_versions
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notices_created_at ON notices (created_at, id)")
+    create_version_triggers(cursor, 'notices')
+
+def _migration_9(cursor):
+    # Count attendance writes too (KPI refresh, cache validation)
+    create_version_triggers(cursor, 'attendance')
+
+def _migration_10(cursor):
+    # Weekly lecture slots per class and subject (replaces the schedule that
+    # was hardcoded in faculty_dashboard); day_of_week is 0 = Monday
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS timetable (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_name TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            day_of_week INTEGER NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            UNIQUE (class_name, subject, day_of_week, start_time)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timetable_subject_day ON timetable (subject, day_of_week, start_time)")
+    seed_timetable(cursor)
+
+    # Marks per (date, subject, class) so "is today's lecture marked?" is one
+    # primary-key range read instead of a scan of attendance
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_daily (
+            date TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            class_name TEXT NOT NULL,
+            marked INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, subject, class_name)
+        ) WITHOUT ROWID
+    ''')
+    for sql in TEXT_DAILY_TRIGGERS.values():
+        cursor.execute(sql)
+    _rebuild_text_daily(cursor)
+
+def _migration_11(cursor):
+    # Classes as their own table; students are enrolled through
+    # users.class_name and subjects through subject_assignments
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS classes (
+            class_name TEXT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    create_version_triggers(cursor, 'classes')
+    for sql in CLASS_TRIGGERS.values():
+        cursor.execute(sql)
+    backfill_classes(cursor)
+
+def _migration_12(cursor):
+    # Date filters compare a virtual integer day column: the rows stay the
+    # same size and the date indexes hold 3-byte integers instead of text
+    cursor.execute(f"ALTER TABLE attendance ADD COLUMN day INTEGER GENERATED ALWAYS AS ({DAY_EXPR}) VIRTUAL")
+    cursor.execute("DROP INDEX IF EXISTS idx_attendance_student_date")
+    cursor.execute("DROP INDEX IF EXISTS idx_attendance_subject_date")
+    cursor.execute("DROP INDEX IF EXISTS idx_attendance_date_status")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_day ON attendance (student_id, day)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_subject_day ON attendance (subject, day)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_day_status ON attendance (day, status)")
+
+def _migration_13(cursor):
+    # Subject and status names move to lookup tables and attendance keeps
+    # their integer ids, shrinking every row and the indexes that carry them.
+    # The rollups stay keyed by subject name.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS statuses (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.executemany("INSERT OR IGNORE INTO statuses (id, name) VALUES (?, ?)",
+                       [(number, status) for status, number in STATUS_IDS.items()])
+    # Anything else an old database holds is kept, after the known statuses
+    cursor.execute("INSERT OR IGNORE INTO statuses (name) SELECT DISTINCT status FROM attendance ORDER BY status")
+    cursor.execute("INSERT OR IGNORE INTO subjects (name) SELECT DISTINCT subject FROM attendance ORDER BY subject")
+    create_version_triggers(cursor, 'subjects')
+
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'attendance'").fetchone()
+    cursor.execute(f'''
+        CREATE TABLE attendance_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            subject_id INTEGER NOT NULL,
+            status_id INTEGER NOT NULL,
+            day INTEGER GENERATED ALWAYS AS ({DAY_EXPR}) VIRTUAL,
+            FOREIGN KEY (student_id) REFERENCES users(id),
+            FOREIGN KEY (subject_id) REFERENCES subjects(id),
+            FOREIGN KEY (status_id) REFERENCES statuses(id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO attendance_new (id, student_id, date, subject_id, status_id)
+        SELECT a.id, a.student_id, a.date, s.id, st.id
+        FROM attendance a
+        JOIN subjects s ON s.name = a.subject
+        JOIN statuses st ON st.name = a.status
+        ORDER BY a.id
+    ''')
+    # Dropping the old table takes its indexes and triggers with it
+    cursor.execute('DROP TABLE attendance')
+    cursor.execute('ALTER TABLE attendance_new RENAME TO attendance')
+    if sequence:
+        # Ids are never reused, even those of rows deleted before the copy
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'attendance'", sequence)
+
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_student_date_subject "
+        "ON attendance (student_id, date, subject_id)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_day ON attendance (student_id, day)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_subject_day ON attendance (subject_id, day)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_day_status ON attendance (day, status_id)")
+    create_version_triggers(cursor, 'attendance')
+    create_summary_triggers(cursor)
+    # Every row was rewritten; caches of attendance rows must reload
+    cursor.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'attendance'")
+
+def _migration_14(cursor):
+    # Server-side login sessions (see sessions.py); the cookie only carries a
+    # random token and the row holds its hash, the session data and the
+    # cached profile
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            token_hash TEXT NOT NULL UNIQUE,
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            ip TEXT,
+            user_agent TEXT,
+            created_at INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+
+def _migration_15(cursor):
+    # Default timetable slots for assignments made after migration 10, and
+    # from now on for every new assignment
+    for sql in TIMETABLE_TRIGGERS.values():
+        cursor.execute(sql)
+    seed_timetable(cursor)
+
+def _migration_16(cursor):
+    # Ids of re-marked and deleted attendance rows, so the columnar
+    # analytics (analytics.py) can patch its copy instead of reloading it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            attendance_id INTEGER NOT NULL
+        )
+    ''')
+    for sql in CHANGE_TRIGGERS.values():
+        cursor.execute(sql)
+
+MIGRATIONS = [
+    _migration_1,
+    _migration_2,
+    _migration_3,
+    _migration_4,
+    _migration_5,
+    _migration_6,
+    _migration_7,
+    _migration_8,
+    _migration_9,
+    _migration_10,
+    _migration_11,
+    _migration_12,
+    _migration_13,
+    _migration_14,
+    _migration_15,
+    _migration_16,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Every table created by the migrations, dependents first (used by --reset)
+TABLES = (
+    'classes',
+    'attendance_daily',
+    'timetable',
+    'subject_assignments',
+    'data_versions',
+    'attendance_changes',
+    'attendance_monthly',
+    'attendance_summary',
+    'attendance',
+    'statuses',
+    'subjects',
+    'notices',
+    'sessions',
+    'users',
+)
+
+def migrate(conn, target=SCHEMA_VERSION):
+    # Every app worker migrates on its first request. Each step takes the
+    # write lock first and re-reads the version under it, so workers starting
+    # together against an old database apply each step exactly once.
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    while version < target:
+        cursor = conn.cursor()
+        _begin_immediate(cursor)
+        try:
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            if version < target:
+                MIGRATIONS[version](cursor)
+                version += 1
+                cursor.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return max(version, target)
+
+def _begin_immediate(cursor):
+    # Another worker's step can hold the lock for longer than the busy
+    # timeout (a large table rewrite); keep waiting for it
+    while True:
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            return
+        except sqlite3.OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            time.sleep(0.1)
+
+# --- Data Versions ---
+
+def create_version_triggers(cursor, table):
+    # Bump data_versions[table] on every write to that table
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (table,))
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+            END
+        ''')
+
+# Inserts are found through the id high-water mark; updates and deletes are
+# logged here. Only the last CHANGE_LOG_ROWS entries are kept; a reader that
+# fell further behind sees the gap in its counts and reloads.
+CHANGE_LOG_ROWS = 100000
+
+CHANGE_TRIGGERS = {
+    'trg_attendance_changes_update': f'''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_changes_update
+        AFTER UPDATE ON attendance
+        BEGIN
+            INSERT INTO attendance_changes (attendance_id) VALUES (OLD.id);
+            INSERT INTO attendance_changes (attendance_id) SELECT NEW.id WHERE NEW.id <> OLD.id;
+            DELETE FROM attendance_changes
+            WHERE seq <= (SELECT MAX(seq) FROM attendance_changes) - {CHANGE_LOG_ROWS};
+        END
+    ''',
+    'trg_attendance_changes_delete': f'''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_changes_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            INSERT INTO attendance_changes (attendance_id) VALUES (OLD.id);
+            DELETE FROM attendance_changes
+            WHERE seq <= (SELECT MAX(seq) FROM attendance_changes) - {CHANGE_LOG_ROWS};
+        END
+    ''',
+}
+
+def data_version(conn, *names):
+    # Current write counters for the given tables, in the order asked for
+    placeholders = ','.join('?' * len(names))
+    rows = conn.execute(
+        f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})", names
+    ).fetchall()
+    versions = {row[0]: row[1] for row in rows}
+    return tuple(versions.get(name, 0) for name in names)
+
+def backfill_subject_assignments(cursor):
+    # Derive assignments from the attendance already marked for each class
+    cursor.execute('''
+        INSERT OR IGNORE INTO subject_assignments (subject, class_name, faculty_id)
+        SELECT DISTINCT s.subject, u.class_name,
+               (SELECT MIN(f.id) FROM users f WHERE f.role = 'faculty' AND f.subject = s.subject)
+        FROM attendance_summary s
+        JOIN users u ON u.id = s.student_id
+        WHERE u.class_name IS NOT NULL
+    ''')
+
+# Any class a student is enrolled in or a subject is assigned to exists in
+# classes, however the row got there (sign-up, admin, marking, imports)
+CLASS_TRIGGERS = {
+    'trg_users_class_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_class_insert
+        AFTER INSERT ON users
+        WHEN NEW.role = 'student' AND NEW.class_name IS NOT NULL AND NEW.class_name != ''
+        BEGIN
+            INSERT OR IGNORE INTO classes (class_name) VALUES (NEW.class_name);
+        END
+    ''',
+    'trg_users_class_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_users_class_update
+        AFTER UPDATE OF class_name, role ON users
+        WHEN NEW.role = 'student' AND NEW.class_name IS NOT NULL AND NEW.class_name != ''
+        BEGIN
+            INSERT OR IGNORE INTO classes (class_name) VALUES (NEW.class_name);
+        END
+    ''',
+    'trg_subject_assignments_class_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_subject_assignments_class_insert
+        AFTER INSERT ON subject_assignments
+        BEGIN
+            INSERT OR IGNORE INTO classes (class_name) VALUES (NEW.class_name);
+        END
+    ''',
+}
+
+def backfill_classes(cursor):
+    cursor.execute('''
+        INSERT OR IGNORE INTO classes (class_name)
+        SELECT DISTINCT class_name FROM users
+        WHERE role = 'student' AND class_name IS NOT NULL AND class_name != ''
+        UNION
+        SELECT class_name FROM subject_assignments
+    ''')
+
+# The schedule that used to be hardcoded in faculty_dashboard:
+# (day_of_week, start_time, end_time, class_name)
+DEFAULT_TIMETABLE = [
+    (0, '09:00', '10:30', 'SE COMP-A'),
+    (0, '11:00', '12:30', 'SE COMP-B'),
+    (1, '08:00', '10:30', 'SE COMP-A'),
+    (2, '14:00', '15:30', 'SE COMP-B'),
+    (3, '10:00', '11:30', 'SE COMP-A'),
+    (4, '13:00', '14:30', 'SE COMP-B'),
+]
+
+def seed_timetable(cursor):
+    # Each default slot is held by every subject taught to that class
+    cursor.executemany('''
+        INSERT OR IGNORE INTO timetable (class_name, subject, day_of_week, start_time, end_time)
+        SELECT class_name, subject, ?, ?, ? FROM subject_assignments WHERE class_name = ?
+    ''', [(day, start, end, class_name) for day, start, end, class_name in DEFAULT_TIMETABLE])
+
+# Subjects assigned to a class later (add_class, a first mark, imports) get
+# the class's default slots too, whatever code path creates the assignment
+TIMETABLE_TRIGGERS = {
+    'trg_subject_assignments_timetable': f'''
+        CREATE TRIGGER IF NOT EXISTS trg_subject_assignments_timetable
+        AFTER INSERT ON subject_assignments
+        BEGIN
+            INSERT OR IGNORE INTO timetable (class_name, subject, day_of_week, start_time, end_time)
+            SELECT NEW.class_name, NEW.subject, slot.column1, slot.column2, slot.column3
+            FROM (VALUES {', '.join(f"({day}, '{start}', '{end}', '{class_name}')" for day, start, end, class_name in DEFAULT_TIMETABLE)}) AS slot
+            WHERE slot.column4 = NEW.class_name;
+        END
+    ''',
+}
+
+# --- Attendance Summaries ---
+# attendance_summary, attendance_monthly and attendance_daily are kept in
+# step with attendance by these triggers, so every write path (marking,
+# deleting users, imports) updates the counters. The rollups are keyed by
+# subject name; status ids are STATUS_IDS (1 = Present, 2 = Absent, 3 = Leave).
+
+SUMMARY_TRIGGERS = {
+    'trg_attendance_summary_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+            SELECT NEW.student_id, name, NEW.status_id = 1, NEW.status_id = 2, NEW.status_id = 3, 1
+            FROM subjects WHERE id = NEW.subject_id
+            ON CONFLICT (student_id, subject) DO UPDATE SET
+                present = present + excluded.present,
+                absent = absent + excluded.absent,
+                leave = leave + excluded.leave,
+                total = total + 1;
+        END
+    ''',
+    'trg_attendance_summary_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_summary SET
+                present = present - (OLD.status_id = 1),
+                absent = absent - (OLD.status_id = 2),
+                leave = leave - (OLD.status_id = 3),
+                total = total - 1
+            WHERE student_id = OLD.student_id
+              AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id);
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id
+              AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id) AND total <= 0;
+        END
+    ''',
+    'trg_attendance_summary_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_update
+        AFTER UPDATE OF student_id, subject_id, status_id ON attendance
+        BEGIN
+            UPDATE attendance_summary SET
+                present = present - (OLD.status_id = 1),
+                absent = absent - (OLD.status_id = 2),
+                leave = leave - (OLD.status_id = 3),
+                total = total - 1
+            WHERE student_id = OLD.student_id
+              AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id);
+            INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+            SELECT NEW.student_id, name, NEW.status_id = 1, NEW.status_id = 2, NEW.status_id = 3, 1
+            FROM subjects WHERE id = NEW.subject_id
+            ON CONFLICT (student_id, subject) DO UPDATE SET
+                present = present + excluded.present,
+                absent = absent + excluded.absent,
+                leave = leave + excluded.leave,
+                total = total + 1;
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id
+              AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id) AND total <= 0;
+        END
+    ''',
+}
+
+MONTHLY_TRIGGERS = {
+    'trg_attendance_monthly_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_monthly (month, present, total)
+            VALUES (substr(NEW.date, 1, 7), NEW.status_id = 1, 1)
+            ON CONFLICT (month) DO UPDATE SET
+                present = present + excluded.present,
+                total = total + 1;
+        END
+    ''',
+    'trg_attendance_monthly_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_monthly SET
+                present = present - (OLD.status_id = 1),
+                total = total - 1
+            WHERE month = substr(OLD.date, 1, 7);
+        END
+    ''',
+    'trg_attendance_monthly_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_update
+        AFTER UPDATE OF date, status_id ON attendance
+        BEGIN
+            UPDATE attendance_monthly SET
+                present = present - (OLD.status_id = 1),
+                total = total - 1
+            WHERE month = substr(OLD.date, 1, 7);
+            INSERT INTO attendance_monthly (month, present, total)
+            VALUES (substr(NEW.date, 1, 7), NEW.status_id = 1, 1)
+            ON CONFLICT (month) DO UPDATE SET
+                present = present + excluded.present,
+                total = total + 1;
+        END
+    ''',
+}
+
+# Rows are counted against the student's class at the time of marking
+DAILY_TRIGGERS = {
+    'trg_attendance_daily_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_daily (date, subject, class_name, marked)
+            SELECT NEW.date, s.name, u.class_name, 1 FROM users u, subjects s
+            WHERE u.id = NEW.student_id AND u.class_name IS NOT NULL AND s.id = NEW.subject_id
+            ON CONFLICT (date, subject, class_name) DO UPDATE SET marked = marked + 1;
+        END
+    ''',
+    'trg_attendance_daily_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_daily SET marked = marked - 1
+            WHERE date = OLD.date AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id)
+              AND class_name = (SELECT class_name FROM users WHERE id = OLD.student_id);
+            DELETE FROM attendance_daily
+            WHERE date = OLD.date AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id)
+              AND marked <= 0;
+        END
+    ''',
+    'trg_attendance_daily_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_update
+        AFTER UPDATE OF student_id, date, subject_id ON attendance
+        BEGIN
+            UPDATE attendance_daily SET marked = marked - 1
+            WHERE date = OLD.date AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id)
+              AND class_name = (SELECT class_name FROM users WHERE id = OLD.student_id);
+            DELETE FROM attendance_daily
+            WHERE date = OLD.date AND subject = (SELECT name FROM subjects WHERE id = OLD.subject_id)
+              AND marked <= 0;
+            INSERT INTO attendance_daily (date, subject, class_name, marked)
+            SELECT NEW.date, s.name, u.class_name, 1 FROM users u, subjects s
+            WHERE u.id = NEW.student_id AND u.class_name IS NOT NULL AND s.id = NEW.subject_id
+            ON CONFLICT (date, subject, class_name) DO UPDATE SET marked = marked + 1;
+        END
+    ''',
+}
+
+def create_summary_triggers(cursor):
+    for triggers in (SUMMARY_TRIGGERS, MONTHLY_TRIGGERS, DAILY_TRIGGERS):
+        for sql in triggers.values():
+            cursor.execute(sql)
+
+def drop_summary_triggers(cursor):
+    for triggers in (SUMMARY_TRIGGERS, MONTHLY_TRIGGERS, DAILY_TRIGGERS):
+        for name in triggers:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+def rebuild_summaries(cursor):
+    # Recompute every counter from the raw attendance rows
+    _rebuild_attendance_summary(cursor)
+    _rebuild_attendance_monthly(cursor)
+    _rebuild_attendance_daily(cursor)
+
+def _rebuild_attendance_summary(cursor):
+    cursor.execute('DELETE FROM attendance_summary')
+    cursor.execute('''
+        INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+        SELECT a.student_id, s.name,
+               SUM(a.status_id = 1), SUM(a.status_id = 2), SUM(a.status_id = 3), COUNT(*)
+        FROM attendance a
+        JOIN subjects s ON s.id = a.subject_id
+        GROUP BY a.student_id, a.subject_id
+    ''')
+
+def _rebuild_attendance_monthly(cursor):
+    cursor.execute('DELETE FROM attendance_monthly')
+    cursor.execute('''
+        INSERT INTO attendance_monthly (month, present, total)
+        SELECT substr(date, 1, 7), SUM(status_id = 1), COUNT(*)
+        FROM attendance
+        GROUP BY substr(date, 1, 7)
+    ''')
+
+def _rebuild_attendance_daily(cursor):
+    cursor.execute('DELETE FROM attendance_daily')
+    cursor.execute('''
+        INSERT INTO attendance_daily (date, subject, class_name, marked)
+        SELECT a.date, s.name, u.class_name, COUNT(*)
+        FROM attendance a
+        JOIN users u ON u.id = a.student_id
+        JOIN subjects s ON s.id = a.subject_id
+        WHERE u.class_name IS NOT NULL
+        GROUP BY a.date, a.subject_id, u.class_name
+    ''')
+
+# --- Text-Column Attendance (schema versions 3-12) ---
+# Until migration 13 attendance stored subject and status as text. The
+# migrations that created the rollups run against that shape, so they keep
+# their own copy of the triggers and rebuilds; migration 13 replaces them.
+
+TEXT_SUMMARY_TRIGGERS = {
+    'trg_attendance_summary_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+            VALUES (NEW.student_id, NEW.subject, NEW.status = 'Present', NEW.status = 'Absent', NEW.status = 'Leave', 1)
+            ON CONFLICT (student_id, subject) DO UPDATE SET
+                present = present + excluded.present,
+                absent = absent + excluded.absent,
+                leave = leave + excluded.leave,
+                total = total + 1;
+        END
+    ''',
+    'trg_attendance_summary_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_summary SET
+                present = present - (OLD.status = 'Present'),
+                absent = absent - (OLD.status = 'Absent'),
+                leave = leave - (OLD.status = 'Leave'),
+                total = total - 1
+            WHERE student_id = OLD.student_id AND subject = OLD.subject;
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id AND subject = OLD.subject AND total <= 0;
+        END
+    ''',
+    'trg_attendance_summary_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_summary_update
+        AFTER UPDATE OF student_id, subject, status ON attendance
+        BEGIN
+            UPDATE attendance_summary SET
+                present = present - (OLD.status = 'Present'),
+                absent = absent - (OLD.status = 'Absent'),
+                leave = leave - (OLD.status = 'Leave'),
+                total = total - 1
+            WHERE student_id = OLD.student_id AND subject = OLD.subject;
+            INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+            VALUES (NEW.student_id, NEW.subject, NEW.status = 'Present', NEW.status = 'Absent', NEW.status = 'Leave', 1)
+            ON CONFLICT (student_id, subject) DO UPDATE SET
+                present = present + excluded.present,
+                absent = absent + excluded.absent,
+                leave = leave + excluded.leave,
+                total = total + 1;
+            DELETE FROM attendance_summary
+            WHERE student_id = OLD.student_id AND subject = OLD.subject AND total <= 0;
+        END
+    ''',
+}
+
+TEXT_MONTHLY_TRIGGERS = {
+    'trg_attendance_monthly_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_monthly (month, present, total)
+            VALUES (substr(NEW.date, 1, 7), NEW.status = 'Present', 1)
+            ON CONFLICT (month) DO UPDATE SET
+                present = present + excluded.present,
+                total = total + 1;
+        END
+    ''',
+    'trg_attendance_monthly_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_monthly SET
+                present = present - (OLD.status = 'Present'),
+                total = total - 1
+            WHERE month = substr(OLD.date, 1, 7);
+        END
+    ''',
+    'trg_attendance_monthly_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_monthly_update
+        AFTER UPDATE OF date, status ON attendance
+        BEGIN
+            UPDATE attendance_monthly SET
+                present = present - (OLD.status = 'Present'),
+                total = total - 1
+            WHERE month = substr(OLD.date, 1, 7);
+            INSERT INTO attendance_monthly (month, present, total)
+            VALUES (substr(NEW.date, 1, 7), NEW.status = 'Present', 1)
+            ON CONFLICT (month) DO UPDATE SET
+                present = present + excluded.present,
+                total = total + 1;
+        END
+    ''',
+}
+
+# Rows are counted against the student's class at the time of marking
+TEXT_DAILY_TRIGGERS = {
+    'trg_attendance_daily_insert': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            INSERT INTO attendance_daily (date, subject, class_name, marked)
+            SELECT NEW.date, NEW.subject, class_name, 1 FROM users
+            WHERE id = NEW.student_id AND class_name IS NOT NULL
+            ON CONFLICT (date, subject, class_name) DO UPDATE SET marked = marked + 1;
+        END
+    ''',
+    'trg_attendance_daily_delete': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE attendance_daily SET marked = marked - 1
+            WHERE date = OLD.date AND subject = OLD.subject
+              AND class_name = (SELECT class_name FROM users WHERE id = OLD.student_id);
+            DELETE FROM attendance_daily
+            WHERE date = OLD.date AND subject = OLD.subject AND marked <= 0;
+        END
+    ''',
+    'trg_attendance_daily_update': '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_daily_update
+        AFTER UPDATE OF student_id, date, subject ON attendance
+        BEGIN
+            UPDATE attendance_daily SET marked = marked - 1
+            WHERE date = OLD.date AND subject = OLD.subject
+              AND class_name = (SELECT class_name FROM users WHERE id = OLD.student_id);
+            DELETE FROM attendance_daily
+            WHERE date = OLD.date AND subject = OLD.subject AND marked <= 0;
+            INSERT INTO attendance_daily (date, subject, class_name, marked)
+            SELECT NEW.date, NEW.subject, class_name, 1 FROM users
+            WHERE id = NEW.student_id AND class_name IS NOT NULL
+            ON CONFLICT (date, subject, class_name) DO UPDATE SET marked = marked + 1;
+        END
+    ''',
+}
+
+def _rebuild_text_summary(cursor):
+    cursor.execute('DELETE FROM attendance_summary')
+    cursor.execute('''
+        INSERT INTO attendance_summary (student_id, subject, present, absent, leave, total)
+        SELECT student_id, subject,
+               SUM(status = 'Present'), SUM(status = 'Absent'), SUM(status = 'Leave'), COUNT(*)
+        FROM attendance
+        GROUP BY student_id, subject
+    ''')
+
+def _rebuild_text_monthly(cursor):
+    cursor.execute('DELETE FROM attendance_monthly')
+    cursor.execute('''
+        INSERT INTO attendance_monthly (month, present, total)
+        SELECT substr(date, 1, 7), SUM(status = 'Present'), COUNT(*)
+        FROM attendance
+        GROUP BY substr(date, 1, 7)
+    ''')
+
+def _rebuild_text_daily(cursor):
+    cursor.execute('DELETE FROM attendance_daily')
+    cursor.execute('''
+        INSERT INTO attendance_daily (date, subject, class_name, marked)
+        SELECT a.date, a.subject, u.class_name, COUNT(*)
+        FROM attendance a
+        JOIN users u ON u.id = a.student_id
+        WHERE u.class_name IS NOT NULL
+        GROUP BY a.date, a.subject, u.class_name
+    ''')
+
+# --- Attendance Writes ---
+# One statement per lecture mark; re-marking only touches rows whose status
+# actually changed, so the summary triggers skip unchanged students. Names
+# are turned into ids by the statement itself (unique-index lookups).
+UPSERT_ATTENDANCE = '''
+    INSERT INTO attendance (student_id, date, subject_id, status_id)
+    VALUES (?, ?, (SELECT id FROM subjects WHERE name = ?), (SELECT id FROM statuses WHERE name = ?))
+    ON CONFLICT (student_id, date, subject_id) DO UPDATE SET status_id = excluded.status_id
+    WHERE status_id != excluded.status_id
+'''
+
+def add_subjects(conn, names):
+    # Make sure every subject name has a subjects row (new ones numbered in order)
+    conn.executemany("INSERT OR IGNORE INTO subjects (name) VALUES (?)", [(name,) for name in dict.fromkeys(names)])
+
+def subject_ids(conn, names):
+    # {name: subjects.id}, adding names that are new
+    names = list(dict.fromkeys(names))
+    add_subjects(conn, names)
+    wanted = set(names)
+    return {name: subject_id for subject_id, name in conn.execute("SELECT id, name FROM subjects") if name in wanted}
+
+def upsert_attendance(conn, records):
+    # records: iterable of (student_id, date, subject, status)
+    records = list(records)
+    add_subjects(conn, (record[2] for record in records))
+    conn.executemany(UPSERT_ATTENDANCE, records)
+
+def record_subject_assignments(conn, subject, class_names, faculty_id):
+    # Remember who teaches the subject to these classes (keeps an existing teacher)
+    conn.executemany('''
+        INSERT INTO subject_assignments (subject, class_name, faculty_id) VALUES (?, ?, ?)
+        ON CONFLICT (subject, class_name) DO UPDATE SET faculty_id = excluded.faculty_id
+        WHERE faculty_id IS NULL
+    ''', [(subject, class_name, faculty_id) for class_name in class_names if class_name])
+
+def init_db(reset=False, rebuild=False):
+    conn = sqlite3.connect(DATABASE)
+    cursor = conn.cursor()
+
+    if reset:
+        for table in TABLES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute('PRAGMA user_version = 0')
+
+    migrate(conn)
+
+    if cursor.execute('SELECT COUNT(*) FROM users').fetchone()[0] == 0:
+        seed_data(cursor)
+
+    if rebuild:
+        rebuild_summaries(cursor)
+        print("Attendance summaries rebuilt.")
+
+    conn.commit()
+    conn.close()
+
+    print(f"Database initialized successfully! (schema version {SCHEMA_VERSION})")
+
+def _hash_password(password):
+    return generate_password_hash(password, method='pbkdf2:sha256')
+
+def hash_passwords(passwords):
+    # pbkdf2 is slow on purpose; spread a batch over all CPU cores
+    passwords = list(passwords)
+    if len(passwords) < 4 or (os.cpu_count() or 1) == 1:
+        return [_hash_password(p) for p in passwords]
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(_hash_password, passwords))
+
+def seed_data(cursor):
     # Insert Admin
     cursor.execute(
         "INSERT INTO users (full_name, email, password, role) VALUES (?, ?, ?, ?)",
-        ('Admin', 'admin@attendease.com', generate_password_hash('Admin@2025', method='pbkdf2:sha256'), 'admin')
+        ('Admin', 'admin@attendease.com', _hash_password('Admin@2025'), 'admin')
     )
 
     # Insert Faculty - One subject each
@@ -67,11 +979,12 @@ def init_db():
         ('Dr. Vikram Sharma', 'vikram.sharma@college.edu', 'Vikram@654', 'Computer Science', 'Discrete Mathematics'),
     ]
 
-    for name, email, password, branch, subject in faculty_data:
-        cursor.execute(
-            "INSERT INTO users (full_name, email, password, role, branch, subject) VALUES (?, ?, ?, ?, ?, ?)",
-            (name, email, generate_password_hash(password, method='pbkdf2:sha256'), 'faculty', branch, subject)
-        )
+    faculty_hashes = hash_passwords(password for _, _, password, _, _ in faculty_data)
+    cursor.executemany(
+        "INSERT INTO users (full_name, email, password, role, branch, subject) VALUES (?, ?, ?, 'faculty', ?, ?)",
+        [(name, email, hashed, branch, subject)
+         for (name, email, _, branch, subject), hashed in zip(faculty_data, faculty_hashes)]
+    )
 
     # Insert Students
     students_csa = [
@@ -97,11 +1010,12 @@ def init_db():
         ('Nikita Gaikwad', 'nikita.gaikwad@student.edu', 'Nikita@2104', 'TE IT', 'I2104', 'Information Technology', 3),
     ]
     all_students = students_csa + students_csb + students_it
-    for name, email, password, class_name, roll, branch, year in all_students:
-        cursor.execute(
-            "INSERT INTO users (full_name, email, password, role, class_name, roll_number, branch, year) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (name, email, generate_password_hash(password, method='pbkdf2:sha256'), 'student', class_name, roll, branch, year)
-        )
+    student_hashes = hash_passwords(student[2] for student in all_students)
+    cursor.executemany(
+        "INSERT INTO users (full_name, email, password, role, class_name, roll_number, branch, year) VALUES (?, ?, ?, 'student', ?, ?, ?, ?)",
+        [(name, email, hashed, class_name, roll, branch, year)
+         for (name, email, _, class_name, roll, branch, year), hashed in zip(all_students, student_hashes)]
+    )
 
     # Subjects per class for attendance simulation
     subjects_map = {
@@ -130,6 +1044,7 @@ def init_db():
 
     # Generate attendance for last 40 working days
     students = cursor.execute("SELECT id, class_name FROM users WHERE role='student'").fetchall()
+    attendance_rows = []
     start_date = date.today() - timedelta(days=60)
     working_days = 0
     current_date = start_date
@@ -151,11 +1066,9 @@ def init_db():
                         attendance_rate = random.randint(40, 59)
 
                     status = 'Present' if random.randint(1, 100) <= attendance_rate else 'Absent'
-                    cursor.execute(
-                        "INSERT INTO attendance (student_id, date, subject, status) VALUES (?, ?, ?, ?)",
-                        (student_id, current_date.strftime('%Y-%m-%d'), subject, status)
-                    )
+                    attendance_rows.append((student_id, current_date.strftime('%Y-%m-%d'), subject, status))
         current_date += timedelta(days=1)
+    upsert_attendance(cursor, attendance_rows)
 
     # Notices insertion
     notices_data = [
@@ -183,10 +1096,148 @@ def init_db():
             (title, content, author, created_at)
         )
 
+    backfill_subject_assignments(cursor)
+    seed_timetable(cursor)
+
+# --- Synthetic Data Generator ---
+# Builds large, reproducible databases for benchmarking. Everything is
+# loaded in one transaction with executemany; the attendance indexes and
+# triggers are dropped during the load and rebuilt once at the end, and
+# every generated account shares one pre-computed password hash.
+
+GENERATE_BATCH_SIZE = 50000
+
+def generate_dataset(path, classes=10, students=60, subjects=6, days=90, lectures=3,
+                     seed=2025, password='Bench@2025', quiet=False):
+    started = time.perf_counter()
+    conn = sqlite3.connect(path)
+    # A freshly generated file can simply be regenerated after a crash
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA cache_size = -262144')
+    migrate(conn)
+    if conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]:
+        conn.close()
+        raise ValueError(f'{path} already contains data; generate into a new file')
+
+    rng = random.Random(seed)
+    shared_hash = _hash_password(password)
+    subject_names = [f'Subject {number:02d}' for number in range(1, subjects + 1)]
+    class_names = [f'Class {number:03d}' for number in range(1, classes + 1)]
+    lectures = min(lectures, subjects)
+
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    saved = cursor.execute('''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = 'attendance' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''').fetchall()
+    for kind, name, _ in saved:
+        cursor.execute(f'DROP {kind.upper()} {name}')
+
+    cursor.execute(
+        "INSERT INTO users (full_name, email, password, role) VALUES ('Admin', 'admin@bench.edu', ?, 'admin')",
+        (shared_hash,)
+    )
+    cursor.executemany(
+        "INSERT INTO users (full_name, email, password, role, subject) VALUES (?, ?, ?, 'faculty', ?)",
+        [(f'Faculty {number:02d}', f'faculty{number:02d}@bench.edu', shared_hash, subject)
+         for number, subject in enumerate(subject_names, 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO users (full_name, email, password, role, class_name, roll_number, year) VALUES (?, ?, ?, 'student', ?, ?, 2)",
+        ((f'Student {c:03d}-{s:04d}', f'student{c:03d}.{s:04d}@bench.edu', shared_hash,
+          class_names[c - 1], f'R{c:03d}{s:04d}')
+         for c in range(1, classes + 1) for s in range(1, students + 1))
+    )
+    subject_codes = subject_ids(cursor, subject_names)
+    roster = {}
+    for student_id, class_name in cursor.execute("SELECT id, class_name FROM users WHERE role='student' ORDER BY id"):
+        roster.setdefault(class_name, []).append(student_id)
+    # Each student gets a fixed attendance rate, spread like the demo data
+    rates = {student_id: rng.choice((0.95, 0.85, 0.8, 0.78, 0.7, 0.5))
+             for class_students in roster.values() for student_id in class_students}
+
+    working_days = []
+    current = date.today()
+    while len(working_days) < days:
+        if current.weekday() < 5:
+            working_days.append(current.isoformat())
+        current -= timedelta(days=1)
+    working_days.reverse()
+
+    present, absent, leave = (STATUS_IDS[status] for status in ATTENDANCE_STATUSES)
+
+    def attendance_rows():
+        random_value = rng.random
+        for day in working_days:
+            for class_name in class_names:
+                # Everyone in a class sits the same lectures that day
+                todays_subjects = [subject_codes[subject] for subject in rng.sample(subject_names, lectures)]
+                for student_id in roster[class_name]:
+                    rate = rates[student_id]
+                    for subject_id in todays_subjects:
+                        roll = random_value()
+                        status = present if roll < rate else (leave if roll > 0.985 else absent)
+                        yield (student_id, day, subject_id, status)
+
+    total_rows = classes * students * days * lectures
+    rows = attendance_rows()
+    loaded = 0
+    while True:
+        batch = list(islice(rows, GENERATE_BATCH_SIZE))
+        if not batch:
+            break
+        cursor.executemany("INSERT INTO attendance (student_id, date, subject_id, status_id) VALUES (?, ?, ?, ?)", batch)
+        loaded += len(batch)
+        if not quiet and loaded % (GENERATE_BATCH_SIZE * 20) == 0:
+            print(f"  {loaded:,}/{total_rows:,} attendance rows ({time.perf_counter() - started:.0f}s)")
+
+    if not quiet:
+        print(f"  rebuilding indexes and summaries ({time.perf_counter() - started:.0f}s)")
+    # Indexes first, then triggers, so the load itself never fires them
+    for kind, _, sql in sorted(saved, key=lambda item: item[0] != 'index'):
+        cursor.execute(sql)
+    rebuild_summaries(cursor)
+    backfill_subject_assignments(cursor)
+    # One weekly lecture per class and subject, spread over the working week
+    cursor.executemany(
+        "INSERT INTO timetable (class_name, subject, day_of_week, start_time, end_time) VALUES (?, ?, ?, ?, ?)",
+        ((class_name, subject, (c + i) % 5, f'{8 + i % 8:02d}:00', f'{9 + i % 8:02d}:00')
+         for c, class_name in enumerate(class_names) for i, subject in enumerate(subject_names))
+    )
+    cursor.execute(
+        "INSERT INTO notices (title, content, author, created_at) VALUES (?, ?, 'Admin', ?)",
+        ('Synthetic dataset', f'{loaded:,} attendance rows generated with seed {seed}.', date.today().isoformat())
+    )
     conn.commit()
+    conn.execute('PRAGMA journal_mode = WAL')
     conn.close()
 
-    print("Database initialized successfully!")
+    elapsed = time.perf_counter() - started
+    if not quiet:
+        print(f"Generated {classes * students:,} students and {loaded:,} attendance rows in {elapsed:.1f}s "
+              f"({loaded / elapsed:,.0f} rows/s) -> {path}")
+    return loaded
 
 if __name__ == '__main__':
-    init_db()
+    parser = argparse.ArgumentParser(description='Create or upgrade the AttendEase database.')
+    parser.add_argument('--reset', action='store_true', help='drop all tables and re-seed the demo data')
+    parser.add_argument('--rebuild-summaries', action='store_true',
+                        help='recompute the attendance_summary/attendance_monthly/attendance_daily counters from the attendance table')
+    subparsers = parser.add_subparsers(dest='command')
+    generate = subparsers.add_parser('generate', help='build a synthetic database for benchmarking')
+    generate.add_argument('--output', default='bench.db', help='database file to create (must be new or empty)')
+    generate.add_argument('--classes', type=int, default=10)
+    generate.add_argument('--students', type=int, default=60, help='students per class')
+    generate.add_argument('--subjects', type=int, default=6, help='subjects taught to every class')
+    generate.add_argument('--days', type=int, default=90, help='working days of attendance')
+    generate.add_argument('--lectures', type=int, default=3, help='lectures per class per day')
+    generate.add_argument('--seed', type=int, default=2025, help='random seed (same seed, same data)')
+    generate.add_argument('--password', default='Bench@2025', help='password shared by every generated account')
+    args = parser.parse_args()
+    if args.command == 'generate':
+        generate_dataset(args.output, classes=args.classes, students=args.students, subjects=args.subjects,
+                         days=args.days, lectures=args.lectures, seed=args.seed, password=args.password)
+    else:
+        init_db(reset=args.reset, rebuild=args.rebuild_summaries)
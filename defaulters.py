@@ -0,0 +1,81 @@
+import re
+from fractions import Fraction
+
+from cache import VersionedCache
+from database import data_version
+
+# --- Defaulter Lists ---
+# Students whose attendance in a subject is below a threshold percentage,
+# each with the number of consecutive lectures they must attend to get back
+# to it. A list is one pass over attendance_summary (students x subjects,
+# never the raw attendance rows) and is cached per (threshold, class,
+# subject) until attendance or users are written again.
+
+WATCHED_TABLES = ('attendance', 'users')
+# Plain decimals with at most two places, so the Fraction stays small
+THRESHOLD = re.compile(r'\d{1,3}(\.\d{1,2})?', re.ASCII)
+
+def parse_threshold(value, default):
+    # A percentage in (0, 100] as an exact Fraction, e.g. '75' or '72.5'
+    text = str(value if value not in (None, '') else default).strip()
+    if not THRESHOLD.fullmatch(text):
+        return None
+    threshold = Fraction(text)
+    return threshold if 0 < threshold <= 100 else None
+
+def lectures_needed(present, total, threshold):
+    # Smallest k with (present + k) / (total + k) >= threshold / 100;
+    # None when it can never be reached (a 100% threshold after an absence).
+    # With threshold = n / d this is ceil((n*total - 100*d*present) / (100*d - n)).
+    n, d = threshold.numerator, threshold.denominator
+    short = n * total - 100 * d * present
+    if short <= 0:
+        return 0
+    if n >= 100 * d:
+        return None
+    return -(-short // (100 * d - n))
+
+def compute_defaulters(conn, threshold, class_name=None, subject=None):
+    # present / total < threshold / 100, compared in integers
+    query = """
+        SELECT u.id, u.full_name, u.roll_number, u.class_name, s.subject,
+               s.present, s.absent, s.leave, s.total
+        FROM attendance_summary s
+        JOIN users u ON u.id = s.student_id
+        WHERE u.role = 'student' AND s.present * ? < s.total * ?
+    """
+    params = [100 * threshold.denominator, threshold.numerator]
+    if class_name:
+        query += " AND u.class_name = ?"
+        params.append(class_name)
+    if subject:
+        query += " AND s.subject = ?"
+        params.append(subject)
+    query += " ORDER BY u.class_name, s.subject, u.roll_number, u.id"
+    return [{
+        'student_id': row[0],
+        'full_name': row[1],
+        'roll_number': row[2],
+        'class_name': row[3],
+        'subject': row[4],
+        'present': row[5],
+        'absent': row[6],
+        'leave': row[7],
+        'total': row[8],
+        'percentage': round(row[5] * 100 / row[8], 1),
+        'lectures_needed': lectures_needed(row[5], row[8], threshold),
+    } for row in conn.execute(query, params)]
+
+class DefaulterLists:
+    def __init__(self, max_entries=1024):
+        self._cache = VersionedCache(max_entries=max_entries)
+
+    def get(self, conn, threshold, class_name=None, subject=None):
+        return self._cache.get(
+            (threshold, class_name or None, subject or None),
+            data_version(conn, *WATCHED_TABLES),
+            lambda: compute_defaulters(conn, threshold, class_name, subject),
+        )
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# --- Password Hashing Pool ---
+# pbkdf2 is deliberately slow. Running it in a small process pool caps how
+# many CPU cores hashing can take, however many request threads are waiting,
+# and a bounded queue turns a login storm into fast "busy" answers instead
+# of every worker stalling.
+
+HASH_METHOD = 'pbkdf2:sha256'
+
+class HashQueueFull(Exception):
+    pass
+
+class PasswordHasher:
+    def __init__(self, workers=2, max_pending=32, timeout=30.0):
+        # workers=0 hashes inline on the calling thread (no pool)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_ms = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HashQueueFull(f'{self._pending} password hashes already queued')
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            if self.workers == 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._busy_ms += (time.perf_counter() - started) * 1000
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, HASH_METHOD)
+
+    def check(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self._pending,
+                'max_pending': self.max_pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_ms': round(self._busy_ms / self._completed, 2) if self._completed else 0,
+            }
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from werkzeug.security import generate_password_hash
+
+from database import ATTENDANCE_STATUSES, DATABASE, migrate, parse_date, upsert_attendance, record_subject_assignments
+from hashing import HASH_METHOD
+
+# --- Bulk CSV Import ---
+# Rosters and historical attendance are read from CSV a batch at a time, so
+# a file of any size is never held in memory. Each batch is validated with
+# a few set-based lookups, its passwords are hashed across a process pool,
+# and it is written with executemany in its own transaction; rows that fail
+# validation are skipped and reported with their line number.
+#
+# users.csv:       full_name,email,password,role[,class_name,roll_number,branch,year,subject]
+# attendance.csv:  student_id or email,date,subject,status
+
+USER_BATCH = 1000
+ATTENDANCE_BATCH = 5000
+MAX_REPORTED_ERRORS = 1000
+ROLES = ('student', 'faculty', 'admin')
+STATUS_ALIASES = {status.lower(): status for status in ATTENDANCE_STATUSES}
+STATUS_ALIASES.update({'p': 'Present', 'a': 'Absent', 'l': 'Leave'})
+
+class ImportReport:
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []  # (line, message), the first MAX_REPORTED_ERRORS
+        self.student_ids = set()
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'rows': self.rows,
+            'imported': self.imported,
+            'errors': self.error_count,
+            'seconds': round(self.seconds, 2),
+            'rows_per_second': round(self.rows_per_second),
+            'first_errors': [{'line': line, 'error': message} for line, message in sorted(self.errors)],
+        }
+
+def open_csv(stream):
+    # Binary uploads and files alike; utf-8-sig drops an Excel BOM
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return csv.DictReader(stream)
+
+def batches(reader, size):
+    # (line number, row) pairs; line 1 is the header
+    rows = ((reader.line_num, row) for row in reader)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def _clean(row, field):
+    return (row.get(field) or '').strip()
+
+def _hash(password):
+    return generate_password_hash(password, method=HASH_METHOD)
+
+def _transaction(conn, write):
+    try:
+        write()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def _lookup(conn, query, values, chunk=900):
+    # Run "... IN (?, ...)" lookups in chunks under SQLite's variable limit
+    values = list(values)
+    for start in range(0, len(values), chunk):
+        part = values[start:start + chunk]
+        yield from conn.execute(query.format(placeholders=','.join('?' * len(part))), part)
+
+INSERT_USER = '''
+    INSERT INTO users (full_name, email, password, role, class_name, roll_number, branch, year, subject)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def import_users(conn, stream, executor=None, batch_size=USER_BATCH, progress=None):
+    reader = open_csv(stream)
+    report = ImportReport('users')
+    missing = {'full_name', 'email', 'password', 'role'} - set(reader.fieldnames or ())
+    if missing:
+        report.error(1, f"missing column(s): {', '.join(sorted(missing))}")
+        return report.finish()
+    seen = set()
+    for batch in batches(reader, batch_size):
+        report.rows += len(batch)
+        valid = []
+        for line, row in batch:
+            email = _clean(row, 'email')
+            role = _clean(row, 'role').lower()
+            year = _clean(row, 'year')
+            if not _clean(row, 'full_name') or not email or not row.get('password'):
+                report.error(line, 'full_name, email and password are required')
+            elif '@' not in email:
+                report.error(line, f'invalid email {email!r}')
+            elif role not in ROLES:
+                report.error(line, f'invalid role {role!r}')
+            elif year and not year.isdigit():
+                report.error(line, f'invalid year {year!r}')
+            elif email.lower() in seen:
+                report.error(line, f'duplicate email {email} in file')
+            else:
+                seen.add(email.lower())
+                valid.append((line, email, role, row))
+        existing = {r[0] for r in _lookup(
+            conn, 'SELECT email FROM users WHERE email IN ({placeholders})', [v[1] for v in valid])}
+        for line, email, _, _ in valid:
+            if email in existing:
+                report.error(line, f'email {email} already exists')
+        valid = [v for v in valid if v[1] not in existing]
+
+        passwords = [row['password'] for _, _, _, row in valid]
+        hashes = list(executor.map(_hash, passwords, chunksize=8)) if executor else [_hash(p) for p in passwords]
+        records = [
+            (_clean(row, 'full_name'), email, hashed, role,
+             _clean(row, 'class_name') or None, _clean(row, 'roll_number') or None,
+             _clean(row, 'branch') or None, int(_clean(row, 'year')) if _clean(row, 'year') else None,
+             _clean(row, 'subject') or None)
+            for (_, email, role, row), hashed in zip(valid, hashes)
+        ]
+        try:
+            _transaction(conn, lambda: conn.executemany(INSERT_USER, records))
+            report.imported += len(records)
+        except sqlite3.IntegrityError:
+            # Someone else created one of these accounts meanwhile; go row by row
+            for (line, email, _, _), record in zip(valid, records):
+                try:
+                    _transaction(conn, lambda: conn.execute(INSERT_USER, record))
+                    report.imported += 1
+                except sqlite3.IntegrityError:
+                    report.error(line, f'email {email} already exists')
+        if progress:
+            progress(report)
+    return report.finish()
+
+def import_attendance(conn, stream, batch_size=ATTENDANCE_BATCH, progress=None):
+    reader = open_csv(stream)
+    report = ImportReport('attendance')
+    fields = set(reader.fieldnames or ())
+    missing = {'date', 'subject', 'status'} - fields
+    if missing or not fields & {'student_id', 'email'}:
+        report.error(1, f"missing column(s): {', '.join(sorted(missing) or ['student_id or email'])}")
+        return report.finish()
+    dates = set()  # canonical YYYY-MM-DD strings already checked; a file repeats a few hundred
+    for batch in batches(reader, batch_size):
+        report.rows += len(batch)
+        parsed = []
+        for line, row in batch:
+            status = STATUS_ALIASES.get(_clean(row, 'status').lower())
+            day = _clean(row, 'date')
+            subject = _clean(row, 'subject')
+            if day not in dates:
+                # Strict: 2025-1-5 would be stored with a NULL attendance.day
+                if parse_date(day) is None:
+                    report.error(line, f'invalid date {day!r} (expected YYYY-MM-DD)')
+                    continue
+                dates.add(day)
+            if status is None:
+                report.error(line, f"invalid status {_clean(row, 'status')!r}")
+            elif not subject:
+                report.error(line, 'subject is required')
+            else:
+                parsed.append((line, _clean(row, 'student_id'), _clean(row, 'email'), day, subject, status))
+
+        # Resolve students for the whole batch in two lookups
+        ids = {int(p[1]) for p in parsed if p[1].isdigit()}
+        emails = {p[2] for p in parsed if not p[1] and p[2]}
+        by_id = {r[0]: r[1] for r in _lookup(
+            conn, "SELECT id, class_name FROM users WHERE role='student' AND id IN ({placeholders})", ids)}
+        by_email = {r[0]: (r[1], r[2]) for r in _lookup(
+            conn, "SELECT email, id, class_name FROM users WHERE role='student' AND email IN ({placeholders})", emails)}
+
+        records, assignments = [], {}
+        for line, student_ref, email, day, subject, status in parsed:
+            if student_ref:
+                student_id = int(student_ref) if student_ref.isdigit() else None
+                class_name = by_id.get(student_id)
+                found = student_id in by_id
+            else:
+                student_id, class_name = by_email.get(email, (None, None))
+                found = student_id is not None
+            if not found:
+                report.error(line, f'no student {student_ref or email or "(blank)"}')
+                continue
+            records.append((student_id, day, subject, status))
+            report.student_ids.add(student_id)
+            if class_name:
+                assignments.setdefault(subject, set()).add(class_name)
+
+        def write():
+            upsert_attendance(conn, records)
+            for subject, class_names in assignments.items():
+                record_subject_assignments(conn, subject, class_names, None)
+        _transaction(conn, write)
+        report.imported += len(records)
+        if progress:
+            progress(report)
+    return report.finish()
+
+def main():
+    parser = argparse.ArgumentParser(description='Import users or attendance from a CSV file.')
+    parser.add_argument('kind', choices=('users', 'attendance'))
+    parser.add_argument('csv_file')
+    parser.add_argument('--db', default=DATABASE, help='database file (default: %(default)s)')
+    parser.add_argument('--batch', type=int, help='rows per transaction')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='password hashing processes for user imports')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    conn.execute('PRAGMA journal_mode = WAL')
+    migrate(conn)
+
+    def progress(report):
+        print(f"  {report.rows:,} rows, {report.imported:,} imported, {report.error_count:,} errors "
+              f"({time.perf_counter() - report.started:.1f}s)")
+
+    with open(args.csv_file, newline='', encoding='utf-8-sig') as f:
+        if args.kind == 'users':
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                report = import_users(conn, f, executor, args.batch or USER_BATCH, progress)
+        else:
+            report = import_attendance(conn, f, args.batch or ATTENDANCE_BATCH, progress)
+    conn.close()
+
+    for line, message in report.errors:
+        print(f"line {line}: {message}")
+    if report.error_count > len(report.errors):
+        print(f"... and {report.error_count - len(report.errors):,} more errors")
+    print(f"Imported {report.imported:,} of {report.rows:,} {report.kind} rows in {report.seconds:.1f}s "
+          f"({report.rows_per_second:,.0f} rows/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+from database import data_version
+
+# --- Admin Dashboard KPI Snapshots ---
+# The admin dashboard is served from a snapshot computed in one batch. A
+# background thread recomputes it every `interval` seconds, or sooner once
+# `write_threshold` writes have hit the watched tables.
+
+logger = logging.getLogger(__name__)
+
+WATCHED_TABLES = ('users', 'attendance')
+
+def compute_kpis(conn):
+    counts = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM users WHERE role='student') as total_students,
+            (SELECT COUNT(*) FROM users WHERE role='faculty') as total_faculty,
+            (SELECT COUNT(DISTINCT class_name) FROM users
+             WHERE role='student' AND class_name IS NOT NULL) as total_classes,
+            (SELECT COALESCE(SUM(total), 0) FROM attendance_summary) as total_records,
+            (SELECT COALESCE(SUM(present), 0) FROM attendance_summary) as present_records
+    """).fetchone()
+    total_records, present_records = counts['total_records'], counts['present_records']
+
+    recent_students = conn.execute("""
+        SELECT u.id, u.full_name, u.class_name, u.roll_number,
+               COALESCE(SUM(s.total), 0) as total_classes,
+               COALESCE(SUM(s.present), 0) as present_count
+        FROM users u
+        LEFT JOIN attendance_summary s ON u.id = s.student_id
+        WHERE u.role = 'student'
+        GROUP BY u.id
+        ORDER BY u.id DESC
+        LIMIT 5
+    """).fetchall()
+
+    classes_overview = conn.execute("""
+        SELECT class_name, COUNT(*) as student_count
+        FROM users
+        WHERE role='student' AND class_name IS NOT NULL
+        GROUP BY class_name
+    """).fetchall()
+
+    # Last 10 calendar months, oldest first, read from the monthly rollup
+    months = []
+    year, month = date.today().year, date.today().month
+    for _ in range(10):
+        months.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    months.reverse()
+    month_rows = conn.execute(
+        "SELECT month, present, total FROM attendance_monthly WHERE month BETWEEN ? AND ?",
+        (months[0].strftime('%Y-%m'), months[-1].strftime('%Y-%m'))
+    ).fetchall()
+    month_totals = {row['month']: row for row in month_rows}
+
+    monthly_trend = []
+    for month_date in months:
+        row = month_totals.get(month_date.strftime('%Y-%m'))
+        month_pct = round((row['present'] / row['total'] * 100) if row and row['total'] > 0 else 0)
+        monthly_trend.append({'month': month_date.strftime('%b'), 'percentage': month_pct})
+
+    return {
+        'total_students': counts['total_students'],
+        'total_faculty': counts['total_faculty'],
+        'total_classes': counts['total_classes'],
+        'overall_attendance': round((present_records / total_records * 100) if total_records > 0 else 0, 1),
+        'recent_students': [
+            {
+                'name': s['full_name'],
+                'class': s['class_name'] or 'N/A',
+                'attendance': round((s['present_count'] / s['total_classes'] * 100) if s['total_classes'] > 0 else 0),
+            }
+            for s in recent_students
+        ],
+        'classes_overview': [dict(c) for c in classes_overview],
+        'monthly_trend': monthly_trend,
+    }
+
+class KpiSnapshots:
+    def __init__(self, acquire, release, interval=60, write_threshold=100, poll=5):
+        # acquire/release hand out database connections (e.g. a pool's)
+        self.acquire = acquire
+        self.release = release
+        self.interval = interval
+        self.write_threshold = write_threshold
+        self.poll = poll
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._thread = None
+        self._pid = None
+
+    def get(self, conn):
+        self._ensure_thread()
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh(conn)
+        return snapshot
+
+    def refresh(self, conn):
+        conn.row_factory = sqlite3.Row
+        versions = data_version(conn, *WATCHED_TABLES)
+        started = time.perf_counter()
+        kpis = compute_kpis(conn)
+        snapshot = {
+            'kpis': kpis,
+            'as_of': datetime.now(),
+            'versions': versions,
+            'refreshed_at': time.monotonic(),
+            'compute_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def is_stale(self, conn):
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            return True
+        if time.monotonic() - snapshot['refreshed_at'] >= self.interval:
+            return True
+        writes = sum(data_version(conn, *WATCHED_TABLES)) - sum(snapshot['versions'])
+        return writes >= self.write_threshold
+
+    def _ensure_thread(self):
+        # Started lazily so forked workers each get their own refresher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='kpi-refresher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll)
+            try:
+                conn = self.acquire()
+                try:
+                    if self.is_stale(conn):
+                        self.refresh(conn)
+                finally:
+                    self.release(conn)
+            except Exception:
+                logger.exception('KPI snapshot refresh failed')
@@ -0,0 +1,154 @@
+import hashlib
+import secrets
+import time
+
+from flask import request
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+# --- Server-side Sessions ---
+# The session cookie holds a random token; the sessions table holds its
+# hash, the session data and the profile of the logged-in user (id, name,
+# role, subject, class), so routes read the profile from `session` instead
+# of querying users on every request. Loading a session is one unique-index
+# lookup, and deleting its row signs the user out on every worker at once.
+
+PROFILE_QUERY = "SELECT id, full_name, role, subject, class_name FROM users WHERE id = ?"
+
+def profile(user):
+    # users row -> the session keys routes read
+    return {
+        'user_id': user['id'],
+        'user_name': user['full_name'],
+        'user_role': user['role'],
+        'user_subject': user['subject'],
+        'user_class': user['class_name'],
+    }
+
+def token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, key=None, user_id=None, last_seen=0):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.key = key              # token_hash of the row, None until saved
+        self.user_id = user_id      # owner when loaded; a change means a new token
+        self.last_seen = last_seen
+        self.modified = False
+
+class SqliteSessionStore(SessionInterface):
+    serializer = session_json_serializer
+
+    def __init__(self, connect, anonymous_lifetime=3600, touch_interval=300):
+        self.connect = connect
+        self.anonymous_lifetime = anonymous_lifetime  # seconds kept for logged-out visitors (flash messages)
+        self.touch_interval = touch_interval          # seconds between last_seen/expiry updates
+
+    def open_session(self, app, request):
+        token = request.cookies.get(self.get_cookie_name(app))
+        if not token:
+            return ServerSession()
+        key = token_hash(token)
+        row = self.connect().execute(
+            "SELECT user_id, data, last_seen FROM sessions WHERE token_hash = ? AND expires_at > ?",
+            (key, int(time.time()))
+        ).fetchone()
+        if row is None:
+            return ServerSession()
+        return ServerSession(self.serializer.loads(row[1]), key, row[0], row[2])
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session is None or (not session and session.key is None):
+            return
+        response.vary.add('Cookie')
+        conn = self.connect()
+        # Never commit what a failed request left behind
+        if conn.in_transaction:
+            conn.rollback()
+        now = int(time.time())
+        user_id = session.get('user_id')
+
+        if session.key is not None and (not session or user_id != session.user_id):
+            # Logged out or in as someone else: the old token stops working
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (session.key,))
+            conn.commit()
+            session.key = None
+            if not session:
+                response.delete_cookie(name, domain=domain, path=path)
+                return
+
+        lifetime = int(app.permanent_session_lifetime.total_seconds()) if user_id else self.anonymous_lifetime
+        if session.key is None:
+            token = secrets.token_urlsafe(32)
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            conn.execute('''
+                INSERT INTO sessions (token_hash, user_id, data, ip, user_agent, created_at, last_seen, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (token_hash(token), user_id, self.serializer.dumps(dict(session)),
+                  request.remote_addr, request.user_agent.string[:200], now, now, now + lifetime))
+            conn.commit()
+            response.set_cookie(
+                name, token,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+        elif session.modified:
+            conn.execute("UPDATE sessions SET data = ?, last_seen = ?, expires_at = ? WHERE token_hash = ?",
+                         (self.serializer.dumps(dict(session)), now, now + lifetime, session.key))
+            conn.commit()
+        elif now - session.last_seen >= self.touch_interval:
+            # Sliding expiry without a write on every request
+            conn.execute("UPDATE sessions SET last_seen = ?, expires_at = ? WHERE token_hash = ?",
+                         (now, now + lifetime, session.key))
+            conn.commit()
+
+    # The methods below leave committing to the caller
+
+    def refresh_user(self, conn, user_id, current=None):
+        # Re-cache the profile in every session of the user after users changed;
+        # `current` (this request's session) is updated in place and saved as usual
+        user = conn.execute(PROFILE_QUERY, (user_id,)).fetchone()
+        if user is None:
+            return self.revoke_user(conn, user_id)
+        fresh = profile(user)
+        if current is not None and current.get('user_id') == user_id:
+            current.update(fresh)
+        skip = current.key if current is not None else None
+        rows = conn.execute("SELECT token_hash, data FROM sessions WHERE user_id = ?", (user_id,)).fetchall()
+        updates = []
+        for key, data in rows:
+            if key != skip:
+                updates.append((self.serializer.dumps({**self.serializer.loads(data), **fresh}), key))
+        conn.executemany("UPDATE sessions SET data = ? WHERE token_hash = ?", updates)
+        return len(rows)
+
+    def revoke(self, conn, session_id):
+        return conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+
+    def revoke_user(self, conn, user_id):
+        return conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,)).rowcount
+
+    def active(self, conn, user_id=None):
+        # Logged-in sessions that have not expired, most recently used first
+        query = '''
+            SELECT s.id, s.user_id, u.full_name, u.email, u.role, s.ip, s.user_agent,
+                   s.created_at, s.last_seen, s.expires_at
+            FROM sessions s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.expires_at > ?
+        '''
+        params = [int(time.time())]
+        if user_id is not None:
+            query += " AND s.user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY s.last_seen DESC, s.id DESC"
+        return conn.execute(query, params).fetchall()
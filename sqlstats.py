@@ -0,0 +1,220 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# --- SQL Instrumentation ---
+# Request connections are wrapped so every statement's text, parameter
+# shape (types only, never values), duration and row count is recorded.
+# Time spent fetching rows counts towards the statement that produced them.
+# At the end of a request the log is folded into per-route totals, and
+# statements slower than the threshold are logged with their query plan.
+
+logger = logging.getLogger('attendease.sql')
+
+def param_shape(params):
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in params.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+def normalize(sql):
+    # One entry per statement shape: collapse whitespace and IN (?, ?, ...) lists
+    sql = ' '.join(sql.split())
+    return re.sub(r'\?(\s*,\s*\?)+', '?, ...', sql)
+
+class Statement:
+    __slots__ = ('sql', 'params', 'shape', 'ms', 'rows')
+
+    def __init__(self, sql, params, shape, ms, rows):
+        self.sql = sql
+        self.params = params
+        self.shape = shape
+        self.ms = ms
+        self.rows = rows
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+
+    def add(self, sql, params, shape, ms, rows):
+        statement = Statement(sql, params, shape, ms, rows)
+        self.statements.append(statement)
+        return statement
+
+    def __len__(self):
+        return len(self.statements)
+
+    @property
+    def total_ms(self):
+        return sum(statement.ms for statement in self.statements)
+
+    @property
+    def total_rows(self):
+        return sum(statement.rows for statement in self.statements)
+
+class InstrumentedCursor:
+    def __init__(self, cursor, statement):
+        self._cursor = cursor
+        self._statement = statement
+
+    def _timed(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        self._statement.ms += (time.perf_counter() - started) * 1000
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._statement.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(self._cursor.fetchmany, *args)
+        self._statement.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._statement.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self._timed(next, self._cursor)
+        self._statement.rows += 1
+        return row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+class InstrumentedConnection:
+    def __init__(self, connection, log):
+        object.__setattr__(self, 'connection', connection)
+        object.__setattr__(self, 'log', log)
+
+    def _record(self, sql, params, shape, started, cursor):
+        # Writes report rows changed; reads count rows as they are fetched
+        rows = cursor.rowcount if cursor.description is None and cursor.rowcount > 0 else 0
+        return self.log.add(sql, params, shape, (time.perf_counter() - started) * 1000, rows)
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        cursor = self.connection.execute(sql, params)
+        return InstrumentedCursor(cursor, self._record(sql, params, param_shape(params), started, cursor))
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        shape = f'{param_shape(seq_of_params[0]) if seq_of_params else "()"} x{len(seq_of_params)}'
+        started = time.perf_counter()
+        cursor = self.connection.executemany(sql, seq_of_params)
+        self._record(sql, seq_of_params[0] if seq_of_params else (), shape, started, cursor)
+        return cursor
+
+    def executescript(self, script):
+        started = time.perf_counter()
+        cursor = self.connection.executescript(script)
+        self.log.add(script, None, 'script', (time.perf_counter() - started) * 1000, 0)
+        return cursor
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def __setattr__(self, name, value):
+        # e.g. row_factory belongs to the wrapped connection
+        setattr(self.connection, name, value)
+
+def explain(connection, statement):
+    if statement.params is None:
+        return []
+    try:
+        plan = connection.execute('EXPLAIN QUERY PLAN ' + statement.sql, statement.params).fetchall()
+    except sqlite3.Error as e:
+        return [f'(no plan: {e})']
+    return [row[3] for row in plan]
+
+class QueryStats:
+    def __init__(self, slow_ms=100, max_statements=500, keep_slow=50):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self._routes = {}
+        self._slow = deque(maxlen=keep_slow)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, log, request_ms, connection=None):
+        endpoint = endpoint or '(unmatched)'
+        slow = []
+        if connection is not None and self.slow_ms is not None:
+            for statement in log.statements:
+                if statement.ms >= self.slow_ms:
+                    plan = explain(connection, statement)
+                    logger.warning('slow query on %s: %.1f ms, %d rows, params %s\n  %s\n  plan: %s',
+                                   endpoint, statement.ms, statement.rows, statement.shape,
+                                   normalize(statement.sql), ' | '.join(plan) or '-')
+                    slow.append({'endpoint': endpoint, 'sql': normalize(statement.sql),
+                                 'params': statement.shape, 'ms': round(statement.ms, 2),
+                                 'rows': statement.rows, 'plan': plan})
+        with self._lock:
+            route = self._routes.get(endpoint)
+            if route is None:
+                route = self._routes[endpoint] = {
+                    'requests': 0, 'request_ms': 0.0, 'max_request_ms': 0.0,
+                    'queries': 0, 'db_ms': 0.0, 'rows': 0, 'statements': {},
+                }
+            route['requests'] += 1
+            route['request_ms'] += request_ms
+            route['max_request_ms'] = max(route['max_request_ms'], request_ms)
+            route['queries'] += len(log)
+            route['db_ms'] += log.total_ms
+            route['rows'] += log.total_rows
+            statements = route['statements']
+            for statement in log.statements:
+                key = normalize(statement.sql)
+                entry = statements.get(key)
+                if entry is None:
+                    if len(statements) >= self.max_statements:
+                        continue
+                    entry = statements[key] = {'count': 0, 'ms': 0.0, 'max_ms': 0.0, 'rows': 0}
+                entry['count'] += 1
+                entry['ms'] += statement.ms
+                entry['max_ms'] = max(entry['max_ms'], statement.ms)
+                entry['rows'] += statement.rows
+            self._slow.extend(slow)
+
+    def stats(self, top=5):
+        with self._lock:
+            routes = []
+            for endpoint, route in self._routes.items():
+                requests = route['requests']
+                heaviest = sorted(route['statements'].items(), key=lambda item: item[1]['ms'], reverse=True)[:top]
+                routes.append({
+                    'endpoint': endpoint,
+                    'requests': requests,
+                    'avg_ms': round(route['request_ms'] / requests, 2),
+                    'max_ms': round(route['max_request_ms'], 2),
+                    'avg_queries': round(route['queries'] / requests, 2),
+                    'avg_db_ms': round(route['db_ms'] / requests, 2),
+                    'avg_rows': round(route['rows'] / requests, 1),
+                    'top_statements': [
+                        {'sql': sql, 'count': entry['count'], 'total_ms': round(entry['ms'], 2),
+                         'avg_ms': round(entry['ms'] / entry['count'], 3), 'max_ms': round(entry['max_ms'], 2),
+                         'avg_rows': round(entry['rows'] / entry['count'], 1)}
+                        for sql, entry in heaviest
+                    ],
+                })
+            # Routes spending the most database time in total come first
+            routes.sort(key=lambda route: route['avg_db_ms'] * route['requests'], reverse=True)
+            return {
+                'slow_ms': self.slow_ms,
+                'routes': routes,
+                'recent_slow': list(self._slow),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
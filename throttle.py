@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import deque
+
+# --- Login Throttling ---
+# Sliding-window attempt counters per key (client IP, account email). Keys
+# that are over the limit are refused before any password hashing happens.
+# Counters live in the worker process, so each worker enforces the limit on
+# its own share of the traffic.
+
+class Throttle:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._hits = {}
+        self._lock = threading.Lock()
+        self.blocked = 0
+
+    def _prune(self, hits, now):
+        while hits and now - hits[0] >= self.window:
+            hits.popleft()
+
+    def retry_after(self, key):
+        # Seconds until another attempt is allowed (0 if allowed now)
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if not hits:
+                return 0
+            self._prune(hits, now)
+            if len(hits) < self.limit:
+                return 0
+            self.blocked += 1
+            return max(1, int(self.window - (now - hits[0])) + 1)
+
+    def hit(self, key):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.setdefault(key, deque())
+            self._prune(hits, now)
+            hits.append(now)
+            if len(self._hits) > 10000:
+                self._sweep(now)
+
+    def reset(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _sweep(self, now):
+        for key in list(self._hits):
+            hits = self._hits[key]
+            self._prune(hits, now)
+            if not hits:
+                del self._hits[key]
+
+    def stats(self):
+        with self._lock:
+            return {'limit': self.limit, 'window': self.window,
+                    'tracked_keys': len(self._hits), 'blocked': self.blocked}